@@ -34,6 +34,7 @@
         'views/hr_department_views.xml',
         'views/res_config_settings_views.xml',
         'views/sn_search_views.xml',
+        'views/sn_statistics_views.xml',
         'views/sn_dashboard.xml',
         
         # 3. Menus (APRÈS les actions)
@@ -48,6 +49,7 @@
         'reports/sn_statistics_report.xml',
         
         # 6. Données (en dernier)
+        'data/sn_admin_cron.xml',
         'data/sn_ministry_data.xml',
         'data/sn_category_data.xml',
         'data/sn_direction_data.xml',
@@ -2,6 +2,8 @@ from odoo import http
 from odoo.http import request
 from odoo.tools import str2bool
 
+from .main import parse_int
+
 
 class SNAdminAPIController(http.Controller):
 
@@ -29,7 +31,7 @@ class SNAdminAPIController(http.Controller):
                 'phone': ministry.phone,
                 'email': ministry.email,
                 'website': ministry.website,
-                'direction_count': ministry.direction_count,
+                'direction_count': ministry.published_direction_count,
             })
         
         return {
@@ -67,9 +69,9 @@ class SNAdminAPIController(http.Controller):
                 'email': ministry.email,
                 'website': ministry.website,
                 'description': ministry.description,
-                'direction_count': ministry.direction_count,
-                'service_count': ministry.service_count,
-                'agent_count': ministry.agent_count,
+                'direction_count': ministry.published_direction_count,
+                'service_count': ministry.published_service_count,
+                'agent_count': ministry.published_agent_count,
             }
         }
 
@@ -102,7 +104,7 @@ class SNAdminAPIController(http.Controller):
                 'type': direction.type,
                 'ministry_id': direction.ministry_id.id,
                 'ministry_name': direction.ministry_id.name,
-                'service_count': direction.service_count,
+                'service_count': direction.published_service_count,
             })
         
         return {
@@ -148,7 +150,7 @@ class SNAdminAPIController(http.Controller):
                 'direction_name': service.direction_id.name,
                 'ministry_id': service.ministry_id.id,
                 'ministry_name': service.ministry_id.name,
-                'agent_count': service.agent_count,
+                'agent_count': service.published_agent_count,
             })
         
         return {
@@ -185,7 +187,16 @@ class SNAdminAPIController(http.Controller):
         if ministry_id:
             domain.append(('ministry_id', '=', int(ministry_id)))
         
-        agents = Agent.search(domain, order='name')
+        # Pagination par curseur, sur demande (?limit= et/ou ?cursor=)
+        cursor = kw.get('cursor')
+        next_cursor = None
+        if cursor or kw.get('limit'):
+            limit = max(min(parse_int(kw.get('limit'), 100) or 100, 500), 1)
+            agents, next_cursor = request.env['sn.search'].sudo().keyset_search(
+                'sn.agent', domain=domain, cursor=cursor, limit=limit,
+            )
+        else:
+            agents = Agent.search(domain, order='name, id')
         
         # Vérifier les paramètres de visibilité
         show_phone = str2bool(IrConfigParameter.get_param('sn_admin.show_phone_public', default='True'))
@@ -218,6 +229,8 @@ class SNAdminAPIController(http.Controller):
             'data': data,
             'meta': {
                 'count': len(data),
+                'next_cursor': next_cursor,
+                'has_more': bool(next_cursor),
             }
         }
 
@@ -236,30 +249,11 @@ class SNAdminAPIController(http.Controller):
         if not query or len(query) < 3:
             return {'error': 'Query too short (minimum 3 characters)', 'code': 400}
         
-        Agent = request.env['sn.agent'].sudo()
-        
-        domain = [
-            ('active', '=', True),
-            ('state', '=', 'active'),
-            '|', '|',
-            ('name', 'ilike', query),
-            ('function', 'ilike', query),
-            ('work_email', 'ilike', query)
-        ]
-        
-        agents = Agent.search(domain, limit=50, order='name')
+        domain = [('active', '=', True), ('state', '=', 'active')]
         
-        results = []
-        for agent in agents:
-            results.append({
-                'type': 'agent',
-                'id': agent.id,
-                'name': agent.name,
-                'function': agent.function,
-                'service': agent.service_id.name,
-                'direction': agent.direction_id.name,
-                'ministry': agent.ministry_id.name,
-            })
+        # Recherche unifiée (ministères, catégories, directions, services, agents),
+        # plein texte ou approchante (mode=fuzzy), triée par pertinence
+        results = request.env['sn.search'].sudo().search_all(query, domain, limit=50, mode=kw.get('mode'))
         
         return {
             'data': results,
@@ -268,3 +262,37 @@ class SNAdminAPIController(http.Controller):
                 'query': query,
             }
         }
+
+    @http.route('/api/v1/statistics', type='json', auth='public', csrf=False)
+    def api_statistics(self, **kw):
+        """Statistiques agrégées (JSON)"""
+        IrConfigParameter = request.env['ir.config_parameter'].sudo()
+        
+        # Vérifier si l'API est activée
+        api_enabled = str2bool(IrConfigParameter.get_param('sn_admin.enable_api', default='False'))
+        if not api_enabled:
+            return {'error': 'API not enabled', 'code': 403}
+        
+        stats = request.env['sn.statistics'].sudo().get_statistics()
+        
+        ministries = []
+        for row in stats['ministries']:
+            ministries.append({
+                'id': row['ministry'].id,
+                'name': row['ministry'].name,
+                'direction_count': row['direction'],
+                'service_count': row['service'],
+                'agent_count': row['agent'],
+                'interim_ratio': round(row['interim_ratio'], 4),
+                'hr_linked_ratio': round(row['hr_linked_ratio'], 4),
+            })
+        
+        return {
+            'data': {
+                'totals': stats['totals'],
+                'by_type': stats['by_type'],
+                'interim_ratio': round(stats['interim_ratio'], 4),
+                'hr_linked_ratio': round(stats['hr_linked_ratio'], 4),
+                'ministries': ministries,
+            }
+        }
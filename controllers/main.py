@@ -1,23 +1,84 @@
 from odoo import http
-from odoo.http import request
+from odoo.http import request, Response
 from odoo.tools import str2bool
-import qrcode
-import io
-import base64
+from werkzeug.http import http_date
+import functools
+import hashlib
+import json
+from datetime import timezone
+
+from ..models.hierarchy import CHILDREN_PAGE_SIZE, TREE_EXPORT_PUBLIC_AGENT_LIMIT
+
+# Durée de cache des QR codes (l'image ne dépend que de l'URL et de la taille)
+QR_CODE_MAX_AGE = 7 * 24 * 3600
+
+
+def parse_int(value, default=None):
+    """Entier d'un paramètre de requête, ou default s'il est absent ou invalide"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def hierarchy_conditional(per_user=True):
+    """
+    Réponses conditionnelles (ETag / Last-Modified) pour les pages publiques
+
+    L'ETag dérive de la version de la hiérarchie: une requête portant un
+    If-None-Match (ou If-Modified-Since) à jour reçoit un 304 sans que la
+    route ni les templates QWeb ne soient exécutés.
+
+    Les pages rendues (per_user) contiennent le jeton CSRF et les
+    informations de session: elles ne sont cachées que par le navigateur
+    (private). Seules les réponses JSON peuvent l'être par un proxy partagé.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kw):
+            Hierarchy = request.env['sn.hierarchy'].sudo()
+            httprequest = request.httprequest
+
+            website = getattr(request, 'website', None)
+            key = [Hierarchy._get_version(), website and website.id, httprequest.host, httprequest.full_path]
+            if per_user:
+                # Le rendu dépend de l'utilisateur, de la langue et des vues du site
+                key += [request.env.uid, request.env.lang, request.env.registry.cache_sequences.get('templates')]
+            etag = hashlib.sha256(repr(key).encode()).hexdigest()
+            last_modified = Hierarchy._get_last_modified()
+            if last_modified:
+                last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+
+            if httprequest.if_none_match:
+                fresh = httprequest.if_none_match.contains(etag)
+            else:
+                fresh = bool(last_modified and httprequest.if_modified_since
+                             and last_modified <= httprequest.if_modified_since)
+
+            if fresh:
+                response = request.make_response('', status=304)
+            else:
+                response = func(self, *args, **kw)
+
+            response.headers['ETag'] = f'"{etag}"'
+            if last_modified:
+                response.headers['Last-Modified'] = http_date(last_modified)
+            response.headers['Cache-Control'] = 'private, no-cache' if per_user else 'public, no-cache'
+            return response
+        return wrapper
+    return decorator
 
 
 class SNAdminController(http.Controller):
 
     @http.route('/organigramme', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def index(self, **kw):
         """Page d'accueil de l'organigramme"""
         Ministry = request.env['sn.ministry'].sudo()
         
-        # Statistiques globales
-        total_ministries = Ministry.search_count([('active', '=', True), ('state', '=', 'active')])
-        total_directions = request.env['sn.direction'].sudo().search_count([('active', '=', True), ('state', '=', 'active')])
-        total_services = request.env['sn.service'].sudo().search_count([('active', '=', True), ('state', '=', 'active')])
-        total_agents = request.env['sn.agent'].sudo().search_count([('active', '=', True), ('state', '=', 'active')])
+        # Statistiques globales (compteurs publiés, une seule agrégation)
+        totals = Ministry.get_published_totals()
         
         # Récupérer les institutions par type
         presidency = Ministry.search([('type', '=', 'presidency'), ('active', '=', True), ('state', '=', 'active')])
@@ -25,10 +86,10 @@ class SNAdminController(http.Controller):
         ministries = Ministry.search([('type', '=', 'ministry'), ('active', '=', True), ('state', '=', 'active')], order='name')
         
         values = {
-            'total_ministries': total_ministries,
-            'total_directions': total_directions,
-            'total_services': total_services,
-            'total_agents': total_agents,
+            'total_ministries': totals['ministries'],
+            'total_directions': totals['directions'],
+            'total_services': totals['services'],
+            'total_agents': totals['agents'],
             'presidency': presidency,
             'primature': primature,
             'ministries': ministries,
@@ -37,6 +98,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_index', values)
 
     @http.route('/organigramme/ministeres', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def ministries(self, **kw):
         """Liste des ministères"""
         Ministry = request.env['sn.ministry'].sudo()
@@ -50,6 +112,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_ministries', values)
 
     @http.route('/organigramme/ministere/<int:ministry_id>', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def ministry(self, ministry_id, **kw):
         """Détails d'un ministère"""
         Ministry = request.env['sn.ministry'].sudo()
@@ -79,6 +142,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_ministry_detail', values)
 
     @http.route('/organigramme/categorie/<int:category_id>', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def category(self, category_id, **kw):
         """Détails d'une catégorie"""
         Category = request.env['sn.category'].sudo()
@@ -98,6 +162,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_category_detail', values)
 
     @http.route('/organigramme/direction/<int:direction_id>', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def direction(self, direction_id, **kw):
         """Détails d'une direction"""
         Direction = request.env['sn.direction'].sudo()
@@ -117,6 +182,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_direction_detail', values)
 
     @http.route('/organigramme/service/<int:service_id>', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def service(self, service_id, **kw):
         """Détails d'un service"""
         Service = request.env['sn.service'].sudo()
@@ -136,6 +202,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_service_detail', values)
 
     @http.route('/organigramme/agent/<int:agent_id>', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def agent(self, agent_id, **kw):
         """Détails d'un agent"""
         Agent = request.env['sn.agent'].sudo()
@@ -159,6 +226,7 @@ class SNAdminController(http.Controller):
         return request.render('sn_admin.organigramme_agent_detail', values)
 
     @http.route('/organigramme/search', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def search(self, **kw):
         """Page de recherche"""
         Agent = request.env['sn.agent'].sudo()
@@ -171,15 +239,12 @@ class SNAdminController(http.Controller):
         ministry_id = kw.get('ministry_id')
         direction_id = kw.get('direction_id')
         service_id = kw.get('service_id')
-        page = int(kw.get('page', 1))
+        cursor = kw.get('cursor')
         per_page = 20
         
         # Construire le domaine de recherche
         domain = [('active', '=', True), ('state', '=', 'active')]
         
-        if query:
-            domain += ['|', '|', ('name', 'ilike', query), ('function', 'ilike', query), ('work_email', 'ilike', query)]
-        
         if ministry_id:
             domain.append(('ministry_id', '=', int(ministry_id)))
         
@@ -189,18 +254,27 @@ class SNAdminController(http.Controller):
         if service_id:
             domain.append(('service_id', '=', int(service_id)))
         
-        # Recherche avec pagination
-        total_count = Agent.search_count(domain)
-        offset = (page - 1) * per_page
-        agents = Agent.search(domain, limit=per_page, offset=offset, order='name')
+        # Recherche paginée par curseur (par nom, ou par pertinence avec un texte):
+        # chaque page coûte autant que la première
+        Search = request.env['sn.search'].sudo()
+        agents, next_cursor = Search.keyset_search(
+            'sn.agent', query, domain, cursor=cursor, limit=per_page, mode=kw.get('mode'),
+        )
         
-        # Pagination
-        total_pages = (total_count + per_page - 1) // per_page
+        # Nombre exact uniquement sur demande (?count=1)
+        total_count = None
+        if str2bool(kw.get('count') or '0'):
+            if query:
+                mode = Search.get_search_mode('sn.agent', query, domain, kw.get('mode'))
+                total_count = Search.ranked_count('sn.agent', query, domain, mode=mode)
+            else:
+                total_count = Agent.search_count(domain)
         
-        # Listes pour les filtres
+        # Listes pour les filtres: les directions et services sont chargés à la
+        # demande par le widget, seules les valeurs sélectionnées sont rendues
         ministries = Ministry.search([('active', '=', True), ('state', '=', 'active')], order='name')
-        directions = Direction.search([('active', '=', True), ('state', '=', 'active')], order='name')
-        services = Service.search([('active', '=', True), ('state', '=', 'active')], order='name')
+        directions = Direction.browse(int(direction_id)).exists() if direction_id else Direction
+        services = Service.browse(int(service_id)).exists() if service_id else Service
         
         values = {
             'agents': agents,
@@ -211,8 +285,8 @@ class SNAdminController(http.Controller):
             'ministries': ministries,
             'directions': directions,
             'services': services,
-            'page': page,
-            'total_pages': total_pages,
+            'cursor': cursor,
+            'next_cursor': next_cursor,
             'total_count': total_count,
         }
         
@@ -221,37 +295,52 @@ class SNAdminController(http.Controller):
     @http.route('/organigramme/api/search', type='json', auth='public', csrf=False)
     def api_search(self, **kw):
         """API AJAX pour recherche en temps réel"""
-        Agent = request.env['sn.agent'].sudo()
-        
         query = kw.get('q', '')
         
         if not query or len(query) < 3:
             return {'results': []}
         
-        domain = [
-            ('active', '=', True),
-            ('state', '=', 'active'),
-            '|', '|',
-            ('name', 'ilike', query),
-            ('function', 'ilike', query),
-            ('work_email', 'ilike', query)
-        ]
+        domain = [('active', '=', True), ('state', '=', 'active')]
         
-        agents = Agent.search(domain, limit=10, order='name')
-        
-        results = []
-        for agent in agents:
-            results.append({
-                'type': 'agent',
-                'id': agent.id,
-                'name': agent.name,
-                'function': agent.function,
-                'service': agent.service_id.name,
-                'direction': agent.direction_id.name,
-                'ministry': agent.ministry_id.name,
-                'phone': agent.work_phone or agent.mobile_phone or '',
-                'email': agent.work_email or '',
-            })
+        # Structures et agents en une requête, avec leur fil d'Ariane
+        results = request.env['sn.search'].sudo().search_all(query, domain, limit=10, mode=kw.get('mode'))
+        
+        return {'results': results}
+
+    @http.route('/organigramme/api/filters/directions', type='http', auth='public', methods=['GET'])
+    @hierarchy_conditional(per_user=False)
+    def api_filter_directions(self, **kw):
+        """Directions d'un ministère, pour le filtre de la recherche"""
+        return self._filter_options_response('sn.direction', kw.get('ministry_id'))
+
+    @http.route('/organigramme/api/filters/services', type='http', auth='public', methods=['GET'])
+    @hierarchy_conditional(per_user=False)
+    def api_filter_services(self, **kw):
+        """Services d'une direction, pour le filtre de la recherche"""
+        return self._filter_options_response('sn.service', kw.get('direction_id'))
+
+    def _filter_options_response(self, model, parent_id):
+        try:
+            parent_id = int(parent_id)
+        except (TypeError, ValueError):
+            # Levée plutôt que retournée: hierarchy_conditional attend une Response
+            raise request.not_found()
+        options_json = request.env['sn.hierarchy'].sudo().get_filter_options_json(model, parent_id)
+        return request.make_response(
+            options_json,
+            headers=[('Content-Type', 'application/json; charset=utf-8')],
+        )
+
+    @http.route('/organigramme/api/autocomplete', type='json', auth='public', csrf=False)
+    def api_autocomplete(self, **kw):
+        """Suggestions en cours de frappe, servies par l'index en mémoire du worker"""
+        query = kw.get('q', '')
+        
+        if not query or len(query) < 3:
+            return {'results': []}
+        
+        limit = max(min(parse_int(kw.get('limit'), 10), 20), 1)
+        results = request.env['sn.autocomplete'].sudo().autocomplete(query, limit=limit)
         
         return {'results': results}
 
@@ -268,32 +357,62 @@ class SNAdminController(http.Controller):
         if not record.exists():
             return request.not_found()
         
-        # Générer l'URL
-        base_url = request.env['ir.config_parameter'].sudo().get_param('web.base.url')
-        model_name = model.split('.')[-1]
-        url = f"{base_url}/organigramme/{model_name}/{record_id}"
+        # Taille (?size=, ramenée à une taille autorisée) et format (?format=png|svg)
+        QrCode = request.env['sn.qr.code'].sudo()
+        size = QrCode._get_size(kw.get('size'))
+        fmt = 'svg' if kw.get('format') == 'svg' else 'png'
         
-        # Générer le QR code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
+        # L'ETag est la clé du cache: un client à jour reçoit un 304 sans lecture de l'image
+        etag = QrCode._get_cache_key(record.qr_code_url, size, fmt)
+        cache_headers = [
+            ('ETag', f'"{etag}"'),
+            ('Cache-Control', f'public, max-age={QR_CODE_MAX_AGE}'),
+        ]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response('', status=304, headers=cache_headers)
         
-        # Convertir en bytes
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        qr_bytes = buffer.getvalue()
+        # Image du QR code (cache partagé de sn.qr.code)
+        model_name = model.split('.')[-1]
+        reference = record._get_qr_code_reference()
+        qr_bytes = record._get_qr_code_image(size=size, fmt=fmt)
         
         # Retourner l'image
         return request.make_response(
             qr_bytes,
             headers=[
-                ('Content-Type', 'image/png'),
-                ('Content-Disposition', f'attachment; filename=qrcode_{model_name}_{record.code or record_id}.png')
-            ]
+                ('Content-Type', 'image/svg+xml' if fmt == 'svg' else 'image/png'),
+                ('Content-Disposition', f'attachment; filename=qrcode_{model_name}_{reference or record_id}.{fmt}'),
+            ] + cache_headers
+        )
+
+    @http.route('/organigramme/qrcode/sheet/<string:model>/<int:record_id>', type='http', auth='user', methods=['GET'])
+    def download_qrcode_sheet(self, model, record_id, **kw):
+        """Planche des QR codes d'un ministère ou d'une catégorie (ZIP d'images ou PDF d'étiquettes), en flux"""
+        if model not in ['sn.ministry', 'sn.category']:
+            return request.not_found()
+        
+        # Droits de l'utilisateur connecté: la planche ne contient que ce qu'il peut lire
+        record = request.env[model].browse(record_id).exists()
+        if not record:
+            return request.not_found()
+        record.check_access('read')
+        
+        fmt = 'pdf' if kw.get('format') == 'pdf' else 'zip'
+        content_type = 'application/pdf' if fmt == 'pdf' else 'application/zip'
+        model_name = model.split('.')[-1]
+        
+        chunks = request.env['sn.qr.code'].stream_sheet(record, fmt, size=kw.get('size'))
+        return Response(
+            chunks,
+            headers=[
+                ('Content-Type', content_type),
+                ('Content-Disposition', f'attachment; filename=qrcodes_{model_name}_{record.code or record_id}.{fmt}'),
+            ],
+            direct_passthrough=True,
         )
 
     @http.route('/organigramme/tree', type='http', auth='public', website=True)
+    @hierarchy_conditional()
     def organigramme_tree(self, **kw):
         """Organigramme interactif public"""
         ministry_id = kw.get('ministry_id')
@@ -307,77 +426,62 @@ class SNAdminController(http.Controller):
     @http.route('/organigramme/api/tree', type='json', auth='public', csrf=False)
     def api_organigramme_tree(self, **kw):
         """API pour les données de l'organigramme interactif"""
-        Ministry = request.env['sn.ministry'].sudo()
+        ministry_id = kw.get('ministry_id')
+        depth = kw.get('depth')
         
+        tree_json = request.env['sn.hierarchy'].sudo().get_public_tree_json(
+            ministry_id=int(ministry_id) if ministry_id else None,
+            depth=int(depth) if depth else None,
+        )
+        return json.loads(tree_json)
+
+    @http.route('/organigramme/api/tree.json', type='http', auth='public', methods=['GET'])
+    @hierarchy_conditional(per_user=False)
+    def api_organigramme_tree_json(self, **kw):
+        """Données de l'organigramme servies directement depuis le cache"""
         ministry_id = kw.get('ministry_id')
+        depth = kw.get('depth')
         
-        def build_node(record, model_type):
-            """Construire un nœud de l'organigramme"""
-            node = {
-                'id': record.id,
-                'name': record.name,
-                'title': record.code if hasattr(record, 'code') else '',
-                'type': model_type,
-                'model': record._name,
-                'children': []
-            }
-            
-            # Ajouter les enfants selon le type
-            if model_type == 'ministry':
-                # Niveau 2: Catégories
-                Category = request.env['sn.category'].sudo()
-                categories = Category.search([
-                    ('ministry_id', '=', record.id),
-                    ('active', '=', True),
-                    ('state', '=', 'active')
-                ])
-                
-                if categories:
-                    node['children_count'] = len(categories)
-                    for category in categories:
-                        node['children'].append(build_node(category, 'category'))
-                else:
-                    # Si pas de catégories, afficher directement les directions
-                    node['children_count'] = len(record.direction_ids)
-                    for direction in record.direction_ids.filtered(lambda d: d.active and d.state == 'active'):
-                        node['children'].append(build_node(direction, 'direction'))
-            elif model_type == 'category':
-                # Niveau 3: Directions de la catégorie
-                node['children_count'] = len(record.direction_ids)
-                for direction in record.direction_ids.filtered(lambda d: d.active and d.state == 'active'):
-                    node['children'].append(build_node(direction, 'direction'))
-            elif model_type == 'direction':
-                # Niveau 4: Services
-                node['children_count'] = len(record.service_ids)
-                for service in record.service_ids.filtered(lambda s: s.active and s.state == 'active'):
-                    node['children'].append(build_node(service, 'service'))
-            elif model_type == 'service':
-                # Niveau 5: Agents
-                node['children_count'] = len(record.agent_ids)
-                # Limiter les agents affichés pour la performance
-                for agent in record.agent_ids.filtered(lambda a: a.active and a.state == 'active')[:10]:
-                    node['children'].append(build_node(agent, 'agent'))
-            
-            return node
-        
-        # Construire l'arbre
-        if ministry_id:
-            ministry = Ministry.browse(int(ministry_id))
-            if ministry.exists():
-                tree_data = build_node(ministry, 'ministry')
-            else:
-                tree_data = {}
-        else:
-            # Arbre complet (limité aux ministères)
-            tree_data = {
-                'id': 0,
-                'name': 'Administration Sénégalaise',
-                'title': 'SENEGAL',
-                'type': 'root',
-                'children': []
-            }
-            
-            for ministry in Ministry.search([('active', '=', True), ('state', '=', 'active')], order='type, name'):
-                tree_data['children'].append(build_node(ministry, 'ministry'))
-        
-        return tree_data
+        tree_json = request.env['sn.hierarchy'].sudo().get_public_tree_json(
+            ministry_id=int(ministry_id) if ministry_id else None,
+            depth=int(depth) if depth else None,
+        )
+        return request.make_response(
+            tree_json,
+            headers=[('Content-Type', 'application/json; charset=utf-8')],
+        )
+
+    @http.route('/organigramme/api/tree/export', type='http', auth='public', methods=['GET'])
+    def api_organigramme_tree_export(self, **kw):
+        """Export complet de l'organigramme en flux (NDJSON par défaut, ou JSON)"""
+        fmt = 'json' if kw.get('format') == 'json' else 'ndjson'
+        content_type = 'application/json' if fmt == 'json' else 'application/x-ndjson'
+        
+        # Export plafonné pour les visiteurs anonymes (la route lit en sudo)
+        agent_limit = TREE_EXPORT_PUBLIC_AGENT_LIMIT if request.env.user._is_public() else None
+        chunks = request.env['sn.hierarchy'].sudo().stream_tree(fmt, agent_limit=agent_limit)
+        return Response(
+            chunks,
+            headers=[
+                ('Content-Type', f'{content_type}; charset=utf-8'),
+                ('Content-Disposition', f'attachment; filename=organigramme_senegal.{fmt}'),
+            ],
+            direct_passthrough=True,
+        )
+
+    @http.route('/organigramme/api/tree/children', type='json', auth='public', csrf=False)
+    def api_organigramme_tree_children(self, **kw):
+        """API pour déplier un nœud de l'organigramme (enfants directs, par page)"""
+        model = kw.get('model')
+        res_id = parse_int(kw.get('id'))
+        
+        if model and (model not in ['sn.ministry', 'sn.category', 'sn.direction', 'sn.service'] or not res_id or res_id < 0):
+            return {'children': [], 'total': 0}
+        
+        # Bornes appliquées aussi par get_children (offset >= 0, 1 <= limit <= max)
+        return request.env['sn.hierarchy'].sudo().get_children(
+            model=model or None,
+            res_id=res_id if model else None,
+            offset=parse_int(kw.get('offset'), 0),
+            limit=parse_int(kw.get('limit'), CHILDREN_PAGE_SIZE),
+        )
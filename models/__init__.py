@@ -1,3 +1,8 @@
+from . import hierarchy
+from . import hierarchy_mixin
+from . import qr_code
+from . import sn_search
+from . import sn_autocomplete
 from . import ministry
 from . import category
 from . import direction
@@ -6,3 +11,6 @@ from . import agent
 from . import hr_employee
 from . import hr_department
 from . import res_config_settings
+from . import ir_config_parameter
+from . import sn_statistics
+from . import sn_statistics_snapshot
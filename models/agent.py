@@ -1,15 +1,14 @@
 import re
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
-import qrcode
-import io
-import base64
+from odoo.tools import str2bool
+from odoo.tools.sql import create_index
 
 
 class Agent(models.Model):
     _name = 'sn.agent'
     _description = 'Agent de l\'Administration Publique'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'sn.hierarchy.mixin', 'sn.qr.code.mixin', 'sn.search.mixin']
     _order = 'service_id, name'
 
     # Champs identité
@@ -17,19 +16,20 @@ class Agent(models.Model):
         string='Nom Complet',
         required=True,
         tracking=True,
-        index=True,
+        index='trigram',
     )
     first_name = fields.Char(string='Prénom')
     last_name = fields.Char(string='Nom de Famille')
     matricule = fields.Char(
         string='Matricule',
-        index=True,
+        index='trigram',
         help='Format: SN-YYYY-NNNNNN',
     )
     function = fields.Char(
         string='Fonction',
         required=True,
         tracking=True,
+        index='trigram',
     )
 
     # Relations
@@ -87,7 +87,7 @@ class Agent(models.Model):
     # Champs de contact
     work_phone = fields.Char(string='Téléphone Bureau')
     mobile_phone = fields.Char(string='Téléphone Mobile')
-    work_email = fields.Char(string='Email Professionnel')
+    work_email = fields.Char(string='Email Professionnel', index='trigram')
 
     # Champs de nomination
     nomination_date = fields.Date(string='Date de nomination')
@@ -96,12 +96,10 @@ class Agent(models.Model):
     end_date = fields.Date(string='Date de fin de fonction')
     is_interim = fields.Boolean(string='Fonction intérimaire', default=False)
     
+    # Chemin hiérarchique (voir sn.hierarchy.mixin)
+    hierarchy_path = fields.Char(compute='_compute_hierarchy_path')
+
     # Champs QR Code
-    qr_code = fields.Binary(
-        string='QR Code',
-        compute='_compute_qr_code',
-        store=True,
-    )
     qr_code_url = fields.Char(
         string='URL QR Code',
         compute='_compute_qr_code_url',
@@ -138,6 +136,47 @@ class Agent(models.Model):
         ('matricule_unique', 'UNIQUE(matricule)', 'Le matricule doit être unique'),
     ]
 
+    _hierarchy_counters = [
+        ('service_id', {'agent_count': 1}),
+    ]
+
+    # Champs rendus publiquement (voir sn.hierarchy.mixin)
+    _hierarchy_public_fields = [
+        'name', 'function', 'matricule', 'work_phone', 'mobile_phone', 'work_email',
+        'service_id', 'direction_id', 'ministry_id', 'active', 'state',
+    ]
+
+    # Recherche plein texte (sn.search)
+    _search_vector_fields = {
+        'A': ['name'],
+        'B': ['function', 'matricule'],
+        'C': ['work_email'],
+    }
+
+    def init(self):
+        super().init()
+        # Pagination par clé (name, id) de la recherche publique et de l'API
+        create_index(self.env.cr, 'sn_agent_name_id_index', self._table, ['name', 'id'])
+
+    def _get_search_result(self):
+        values = super()._get_search_result()
+        # Coordonnées selon les paramètres de publication du portail
+        IrConfigParameter = self.env['ir.config_parameter'].sudo()
+        show_phone = str2bool(IrConfigParameter.get_param('sn_admin.show_phone_public', default='True'))
+        show_email = str2bool(IrConfigParameter.get_param('sn_admin.show_email_public', default='True'))
+        values.update({
+            'function': self.function,
+            'phone': (self.work_phone or self.mobile_phone or '') if show_phone else '',
+            'email': (self.work_email or '') if show_email else '',
+        })
+        return values
+
+    @api.depends('service_id.hierarchy_path')
+    def _compute_hierarchy_path(self):
+        for record in self:
+            parent_path = record.service_id.hierarchy_path or ''
+            record.hierarchy_path = f'{parent_path}A{record.id}/' if record.id else False
+    
     @api.depends('name')
     def _compute_qr_code_url(self):
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
@@ -147,20 +186,6 @@ class Agent(models.Model):
             else:
                 record.qr_code_url = False
     
-    @api.depends('qr_code_url')
-    def _compute_qr_code(self):
-        for record in self:
-            if record.qr_code_url:
-                qr = qrcode.QRCode(version=1, box_size=10, border=5)
-                qr.add_data(record.qr_code_url)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                record.qr_code = base64.b64encode(buffer.getvalue())
-            else:
-                record.qr_code = False
-    
     @api.onchange('employee_id')
     def _onchange_employee_id(self):
         if self.employee_id:
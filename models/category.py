@@ -1,13 +1,15 @@
 from odoo import models, fields, api
 
+from .hierarchy import PUBLISHED_DOMAIN
+
 
 class Category(models.Model):
     _name = 'sn.category'
     _description = 'Catégorie principale (Cabinet, Secrétariat général, Directions, Autres administrations)'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'sn.hierarchy.mixin', 'sn.search.mixin']
     _order = 'ministry_id, name'
 
-    name = fields.Char(string='Nom', required=True, tracking=True, index=True)
+    name = fields.Char(string='Nom', required=True, tracking=True, index='trigram')
     code = fields.Char(string='Code', size=20, index=True)
     active = fields.Boolean(string='Actif', default=True)
     state = fields.Selection(
@@ -33,29 +35,80 @@ class Category(models.Model):
         inverse_name='category_id',
         string='Directions Générales',
     )
+    service_ids = fields.One2many(
+        comodel_name='sn.service',
+        inverse_name='category_id',
+        string='Services',
+    )
     
     direction_count = fields.Integer(
         string='Nombre de Directions',
-        compute='_compute_direction_count',
-        store=True,
+        readonly=True,
+        default=0,
+        copy=False,
     )
     
     service_count = fields.Integer(
         string='Nombre de Services',
         compute='_compute_service_count',
+        store=True,
+    )
+    
+    published_direction_count = fields.Integer(
+        string='Directions publiées',
+        compute='_compute_published_direction_count',
+        store=True,
     )
     
+    # Chemin hiérarchique (voir sn.hierarchy.mixin)
+    hierarchy_path = fields.Char(compute='_compute_hierarchy_path')
+
     # Champs de visibilité publique
     public_visible = fields.Boolean(string='Visible Publiquement', default=True)
     
-    @api.depends('direction_ids')
-    def _compute_direction_count(self):
+    _hierarchy_counters = [
+        ('ministry_id', {'category_count': 1}),
+    ]
+    _hierarchy_computed_counters = ['service_count', 'published_direction_count']
+
+    # Champs rendus publiquement (voir sn.hierarchy.mixin)
+    _hierarchy_public_fields = ['name', 'code', 'ministry_id', 'active', 'state']
+
+    # Recherche plein texte (sn.search)
+    _search_vector_fields = {
+        'A': ['name'],
+        'B': ['code'],
+    }
+
+    def _recount_direction_count(self):
+        """Recomptage complet (réparation) du nombre de directions: {catégorie: valeur}"""
+        return dict(self.env['sn.direction'].sudo()._read_group(
+            [('category_id', 'in', self.ids)], ['category_id'], ['__count'],
+        ))
+    
+    @api.depends('direction_ids.active', 'direction_ids.state')
+    def _compute_published_direction_count(self):
+        counts = dict(self.env['sn.direction'].sudo()._read_group(
+            PUBLISHED_DOMAIN + [('category_id', 'in', self.ids)], ['category_id'], ['__count'],
+        ))
         for category in self:
-            category.direction_count = len(category.direction_ids)
+            category.published_direction_count = counts.get(category, 0)
     
+    @api.depends('service_ids', 'service_ids.active', 'service_ids.direction_id.active')
     def _compute_service_count(self):
+        counts = dict(self.env['sn.service'].sudo()._read_group(
+            [('category_id', 'in', self.ids), ('direction_id.active', '=', True)],
+            ['category_id'],
+            ['__count'],
+        ))
+        for category in self:
+            category.service_count = counts.get(category, 0)
+    
+    @api.depends('ministry_id.hierarchy_path')
+    def _compute_hierarchy_path(self):
         for category in self:
-            category.service_count = sum(direction.service_count for direction in category.direction_ids)
+            parent_path = category.ministry_id.hierarchy_path or ''
+            category.hierarchy_path = f'{parent_path}C{category.id}/' if category.id else False
     
     def action_view_directions(self):
         """Ouvrir la liste des directions de cette catégorie"""
@@ -68,3 +121,30 @@ class Category(models.Model):
             'domain': [('category_id', '=', self.id)],
             'context': {'default_category_id': self.id, 'default_ministry_id': self.ministry_id.id},
         }
+    
+    def action_view_services(self):
+        """Ouvrir la liste des services de cette catégorie (toutes directions confondues)"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': f'Services - {self.name}',
+            'res_model': 'sn.service',
+            'view_mode': 'list,form,kanban',
+            'domain': self._get_subtree_domain(),
+        }
+    
+    def action_view_agents(self):
+        """Ouvrir la liste des agents de cette catégorie (toutes directions confondues)"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': f'Agents - {self.name}',
+            'res_model': 'sn.agent',
+            'view_mode': 'list,form,kanban',
+            'domain': self._get_subtree_domain(),
+        }
+
+    def action_download_qr_codes(self):
+        """Télécharger les QR codes des structures et agents (ZIP ou PDF selon le contexte)"""
+        fmt = self.env.context.get('qr_sheet_format', 'zip')
+        return self.env['sn.qr.code']._get_sheet_action(self, fmt)
@@ -1,14 +1,13 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
-import qrcode
-import io
-import base64
+
+from .hierarchy import PUBLISHED_DOMAIN
 
 
 class Direction(models.Model):
     _name = 'sn.direction'
     _description = 'Direction Générale ou Régionale'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'sn.hierarchy.mixin', 'sn.qr.code.mixin', 'sn.search.mixin']
     _order = 'ministry_id, name'
 
     # Champs de base
@@ -16,7 +15,7 @@ class Direction(models.Model):
         string='Nom',
         required=True,
         tracking=True,
-        index=True,
+        index='trigram',
     )
     code = fields.Char(
         string='Code',
@@ -102,12 +101,10 @@ class Direction(models.Model):
         domain="[('country_id.code', '=', 'SN')]",
     )
 
+    # Chemin hiérarchique (voir sn.hierarchy.mixin)
+    hierarchy_path = fields.Char(compute='_compute_hierarchy_path')
+
     # Champs QR Code
-    qr_code = fields.Binary(
-        string='QR Code',
-        compute='_compute_qr_code',
-        store=True,
-    )
     qr_code_url = fields.Char(
         string='URL QR Code',
         compute='_compute_qr_code_url',
@@ -123,12 +120,25 @@ class Direction(models.Model):
     # Champs calculés
     service_count = fields.Integer(
         string='Nombre de Services',
-        compute='_compute_service_count',
-        store=True,
+        readonly=True,
+        default=0,
+        copy=False,
     )
     agent_count = fields.Integer(
         string='Nombre d\'Agents',
-        compute='_compute_agent_count',
+        readonly=True,
+        default=0,
+        copy=False,
+    )
+    # Compteurs publiés (actifs et à l'état actif), affichés sur le portail
+    published_service_count = fields.Integer(
+        string='Services publiés',
+        compute='_compute_published_counts',
+        store=True,
+    )
+    published_agent_count = fields.Integer(
+        string='Agents publiés',
+        compute='_compute_published_counts',
         store=True,
     )
     employee_count = fields.Integer(
@@ -142,16 +152,47 @@ class Direction(models.Model):
         ('code_ministry_unique', 'UNIQUE(code, ministry_id)', 'Le code doit être unique par ministère'),
     ]
 
-    @api.depends('service_ids')
-    def _compute_service_count(self):
-        for record in self:
-            record.service_count = len(record.service_ids)
+    _hierarchy_counters = [
+        ('ministry_id', {'direction_count': 1, 'service_count': 'service_count', 'agent_count': 'agent_count'}),
+        ('category_id', {'direction_count': 1}),
+    ]
+    _hierarchy_computed_counters = ['published_service_count', 'published_agent_count']
 
-    @api.depends('service_ids.agent_ids')
-    def _compute_agent_count(self):
-        for record in self:
-            record.agent_count = sum(record.service_ids.mapped('agent_count'))
+    # Champs rendus publiquement (voir sn.hierarchy.mixin)
+    _hierarchy_public_fields = [
+        'name', 'code', 'type', 'ministry_id', 'category_id', 'manager_id',
+        'phone', 'email', 'active', 'state',
+    ]
+
+    # Recherche plein texte (sn.search)
+    _search_vector_fields = {
+        'A': ['name'],
+        'B': ['code'],
+        'C': ['email'],
+    }
+
+    # Recomptages complets des compteurs (réparation): {direction: valeur}
+    def _recount_service_count(self):
+        return dict(self.env['sn.service'].sudo()._read_group(
+            [('direction_id', 'in', self.ids)], ['direction_id'], ['__count'],
+        ))
+
+    def _recount_agent_count(self):
+        return dict(self.env['sn.service'].sudo()._read_group(
+            [('direction_id', 'in', self.ids)], ['direction_id'], ['agent_count:sum'],
+        ))
     
+    @api.depends('service_ids.active', 'service_ids.state', 'service_ids.published_agent_count')
+    def _compute_published_counts(self):
+        groups = self.env['sn.service'].sudo()._read_group(
+            PUBLISHED_DOMAIN + [('direction_id', 'in', self.ids)],
+            ['direction_id'],
+            ['__count', 'published_agent_count:sum'],
+        )
+        counts = {direction: (services, agents) for direction, services, agents in groups}
+        for record in self:
+            record.published_service_count, record.published_agent_count = counts.get(record, (0, 0))
+
     @api.depends('department_id.total_employee')
     def _compute_employee_count(self):
         for record in self:
@@ -160,6 +201,12 @@ class Direction(models.Model):
             else:
                 record.employee_count = 0
     
+    @api.depends('ministry_id.hierarchy_path', 'category_id.hierarchy_path')
+    def _compute_hierarchy_path(self):
+        for record in self:
+            parent_path = (record.category_id or record.ministry_id).hierarchy_path or ''
+            record.hierarchy_path = f'{parent_path}D{record.id}/' if record.id else False
+    
     @api.depends('name')
     def _compute_qr_code_url(self):
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
@@ -169,20 +216,6 @@ class Direction(models.Model):
             else:
                 record.qr_code_url = False
     
-    @api.depends('qr_code_url')
-    def _compute_qr_code(self):
-        for record in self:
-            if record.qr_code_url:
-                qr = qrcode.QRCode(version=1, box_size=10, border=5)
-                qr.add_data(record.qr_code_url)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                record.qr_code = base64.b64encode(buffer.getvalue())
-            else:
-                record.qr_code = False
-
     @api.constrains('ministry_id')
     def _check_ministry_active(self):
         for record in self:
@@ -0,0 +1,613 @@
+import json
+from collections import defaultdict
+
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+
+# Domaine des structures publiées (actives et validées)
+PUBLISHED_DOMAIN = [('active', '=', True), ('state', '=', 'active')]
+
+# Niveaux de la hiérarchie, du plus haut au plus bas
+LEVELS = ('ministry', 'category', 'direction', 'service', 'agent')
+
+LEVEL_MODELS = {
+    'ministry': 'sn.ministry',
+    'category': 'sn.category',
+    'direction': 'sn.direction',
+    'service': 'sn.service',
+    'agent': 'sn.agent',
+}
+
+# Champs lus pour chaque niveau
+LEVEL_FIELDS = {
+    'ministry': ['name', 'code'],
+    'category': ['name', 'code', 'ministry_id'],
+    'direction': ['name', 'code', 'ministry_id', 'category_id'],
+    'service': ['name', 'code', 'direction_id', 'ministry_id'],
+    'agent': ['name', 'service_id', 'direction_id', 'ministry_id'],
+}
+
+# Champ de rattachement de chaque niveau vers ses ancêtres possibles
+PARENT_FIELDS = {
+    'category': {'ministry': 'ministry_id'},
+    'direction': {'category': 'category_id', 'ministry': 'ministry_id'},
+    'service': {'direction': 'direction_id', 'ministry': 'ministry_id'},
+    'agent': {'service': 'service_id', 'direction': 'direction_id', 'ministry': 'ministry_id'},
+}
+
+# Taille des pages de l'expansion paresseuse
+CHILDREN_PAGE_SIZE = 50
+CHILDREN_MAX_PAGE_SIZE = 200
+
+# Nombre maximum d'agents de l'export complet pour un visiteur anonyme
+TREE_EXPORT_PUBLIC_AGENT_LIMIT = 5000
+
+# Compteur de version de la hiérarchie (partagé entre les workers)
+HIERARCHY_VERSION_PARAM = 'sn_admin.hierarchy_version'
+HIERARCHY_DATE_PARAM = 'sn_admin.hierarchy_date'
+
+# Nombre d'agents affichés sous un service (paramètre sn_admin.orgchart_agent_limit)
+AGENT_PREVIEW_LIMIT = 10
+
+# Listes d'options des filtres de recherche: champ parent de chaque modèle
+FILTER_PARENT_FIELDS = {
+    'sn.direction': 'ministry_id',
+    'sn.service': 'direction_id',
+}
+
+# Modèles portant des compteurs, du bas vers le haut de la hiérarchie
+COUNTER_MODELS = ('sn.service', 'sn.direction', 'sn.category', 'sn.ministry')
+
+# Clé des compteurs différés dans cr.precommit.data
+DEFERRED_COUNTERS_KEY = 'sn_admin.deferred_counters'
+
+
+class Hierarchy(models.AbstractModel):
+    _name = 'sn.hierarchy'
+    _description = 'Moteur de la hiérarchie de l\'administration'
+
+    @api.model
+    def get_tree(self, ministry_id=None, depth=None, levels=None, limits=None):
+        """
+        Retourne l'arbre de l'organigramme (compatible OrgChart.js)
+
+        Utilisé par l'organigramme du back-office et par le portail public.
+        Chaque niveau est chargé par une seule requête groupée, puis l'arbre
+        est assemblé en mémoire: le nombre de requêtes ne dépend pas de la
+        taille de l'administration.
+
+        :param ministry_id: racine de l'arbre (tous les ministères si vide)
+        :param depth: nombre de niveaux sous la racine (illimité si vide)
+        :param levels: niveaux à inclure parmi LEVELS (tous si vide);
+            les enfants d'un niveau exclu sont rattachés à l'ancêtre inclus
+            le plus proche
+        :param limits: nombre maximum d'enfants par parent, par niveau
+        """
+        levels = self._normalize_levels(levels)
+        limits = dict({'agent': self._get_agent_preview_limit()}, **(limits or {}))
+
+        Ministry = self.env['sn.ministry']
+        if ministry_id:
+            ministries = Ministry.with_context(active_test=False).search_read(
+                [('id', '=', ministry_id)], LEVEL_FIELDS['ministry'],
+            )
+            if not ministries:
+                return {}
+        else:
+            ministries = Ministry.search_read(PUBLISHED_DOMAIN, LEVEL_FIELDS['ministry'], order='type, name')
+
+        # La racine virtuelle ajoute un niveau au-dessus des ministères
+        ministry_depth = None
+        if depth is not None:
+            ministry_depth = depth if ministry_id else depth - 1
+
+        ministry_nodes = self._build_ministry_nodes(ministries, ministry_depth, levels, limits)
+
+        if ministry_id:
+            return ministry_nodes[0]
+
+        # Arbre complet (limité aux ministères)
+        return {
+            'id': 0,
+            'name': 'Administration Sénégalaise',
+            'title': 'SENEGAL',
+            'type': 'root',
+            'children': ministry_nodes if depth is None or depth > 0 else [],
+        }
+
+    @api.model
+    def get_children(self, model=None, res_id=None, offset=0, limit=CHILDREN_PAGE_SIZE):
+        """
+        Enfants directs publiés d'un nœud, par page
+
+        Chaque enfant porte children_count pour que le client sache s'il
+        peut être déplié. Sans modèle, retourne les ministères (enfants de
+        la racine).
+        """
+        offset = max(offset or 0, 0)
+        limit = max(min(limit or CHILDREN_PAGE_SIZE, CHILDREN_MAX_PAGE_SIZE), 1)
+        result = {'children': [], 'total': 0, 'offset': offset, 'limit': limit}
+
+        if not model:
+            child_level, domain, order = 'ministry', [], 'type, name'
+        else:
+            level = next((key for key, value in LEVEL_MODELS.items() if value == model), None)
+            if not level:
+                return result
+            if level == 'ministry':
+                # Catégories si le ministère en a, sinon directions
+                has_categories = bool(self._count_by_parent('sn.category', 'ministry_id', [res_id]))
+                child_level = 'category' if has_categories else 'direction'
+            else:
+                child_level = self._child_level(level, LEVELS)
+            if not child_level:
+                return result
+            domain, order = [(PARENT_FIELDS[child_level][level], '=', res_id)], None
+
+        Model = self.env[LEVEL_MODELS[child_level]]
+        domain = PUBLISHED_DOMAIN + domain
+        rows = Model.search_read(domain, LEVEL_FIELDS[child_level], offset=offset, limit=limit, order=order, load=None)
+        counts = self._children_counts(child_level, [row['id'] for row in rows])
+
+        for row in rows:
+            node = self._make_node(row, child_level, LEVEL_MODELS[child_level])
+            if counts is not None:
+                node['children_count'] = counts.get(row['id'], 0)
+            result['children'].append(node)
+        result['total'] = Model.search_count(domain)
+        return result
+
+    @api.model
+    def stream_tree(self, fmt='ndjson', agent_limit=None):
+        """
+        Export complet de l'arbre, ministère par ministère
+
+        Retourne un générateur destiné à une réponse HTTP en flux: il ouvre
+        son propre curseur (celui de la requête est fermé quand le flux est
+        consommé) et vide le cache de l'environnement après chaque
+        service, de sorte que la mémoire reste stable quelle que soit la
+        taille de l'administration.
+
+        :param agent_limit: nombre maximum d'agents exportés (illimité si vide)
+        """
+        registry = self.env.registry
+        uid, context, su = self.env.uid, dict(self.env.context), self.env.su
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context, su=su)
+                yield from env['sn.hierarchy']._iter_tree_chunks(fmt, agent_limit=agent_limit)
+
+        return generate()
+
+    def _iter_tree_chunks(self, fmt='ndjson', agent_limit=None):
+        """
+        Morceaux (bytes) de l'arbre complet
+
+        ndjson: une ligne pour la racine puis une ligne par ministère;
+        json: le même document que /organigramme/api/tree, écrit au fil
+        de l'eau. Les structures d'un ministère sont lues d'un bloc, les
+        agents service par service: un ministère très peuplé n'est jamais
+        chargé en entier.
+
+        :param agent_limit: nombre maximum d'agents exportés (illimité si
+            vide); au-delà, les services ne portent plus que children_count
+        """
+        root = {
+            'id': 0,
+            'name': 'Administration Sénégalaise',
+            'title': 'SENEGAL',
+            'type': 'root',
+        }
+        if fmt == 'json':
+            yield json.dumps(root, ensure_ascii=False)[:-1].encode('utf-8') + b', "children": ['
+        else:
+            yield json.dumps(root, ensure_ascii=False).encode('utf-8') + b'\n'
+
+        structure_levels = [level for level in LEVELS if level != 'agent']
+        remaining = agent_limit
+
+        def agent_chunks(service_id):
+            nonlocal remaining
+            if remaining is not None and remaining <= 0:
+                return
+            rows = self.env['sn.agent'].search_read(
+                PUBLISHED_DOMAIN + [('service_id', '=', service_id)],
+                LEVEL_FIELDS['agent'],
+                order='name, id',
+                limit=remaining,
+                load=None,
+            )
+            if remaining is not None:
+                remaining -= len(rows)
+            yield b', '.join(
+                json.dumps(self._make_node(row, 'agent', 'sn.agent'), ensure_ascii=False).encode('utf-8')
+                for row in rows
+            )
+            self.env.invalidate_all()
+
+        def node_chunks(node):
+            children = node.pop('children')
+            yield json.dumps(node, ensure_ascii=False)[:-1].encode('utf-8') + b', "children": ['
+            if node['type'] == 'service':
+                yield from agent_chunks(node['id'])
+            else:
+                for index, child in enumerate(children):
+                    if index:
+                        yield b', '
+                    yield from node_chunks(child)
+            yield b']}'
+
+        ministry_ids = self.env['sn.ministry'].search(PUBLISHED_DOMAIN, order='type, name').ids
+        for index, ministry_id in enumerate(ministry_ids):
+            node = self.get_tree(ministry_id=ministry_id, levels=structure_levels)
+            services = list(self._iter_nodes(node, 'service'))
+            counts = self._count_by_parent('sn.agent', 'service_id', [service['id'] for service in services])
+            for service in services:
+                service['children_count'] = counts.get(service['id'], 0)
+            self.env.invalidate_all()
+
+            if fmt == 'json' and index:
+                yield b', '
+            yield from node_chunks(node)
+            if fmt != 'json':
+                yield b'\n'
+
+        if fmt == 'json':
+            yield b']}'
+
+    @api.model
+    def _iter_nodes(self, node, model_type):
+        """Nœuds d'un type donné dans un sous-arbre"""
+        if node['type'] == model_type:
+            yield node
+        for child in node['children']:
+            yield from self._iter_nodes(child, model_type)
+
+    @api.model
+    def get_public_tree_json(self, ministry_id=None, depth=None):
+        """
+        Arbre public sérialisé (bytes JSON), mis en cache par version
+
+        Une requête à chaud ne touche pas l'ORM: la version est lue depuis
+        le cache de ir.config_parameter et l'arbre depuis le cache du
+        registre, tous deux invalidés dans chaque worker à chaque
+        incrément de version.
+        """
+        return self._get_public_tree_json(ministry_id or None, depth, self._get_version())
+
+    @tools.ormcache('ministry_id', 'depth', 'version')
+    def _get_public_tree_json(self, ministry_id, depth, version):
+        tree = self.sudo().get_tree(ministry_id=ministry_id, depth=depth)
+        return json.dumps(tree, ensure_ascii=False).encode('utf-8')
+
+    @api.model
+    def get_filter_options_json(self, model_name, parent_id):
+        """
+        Options d'un filtre de la recherche (JSON): directions d'un
+        ministère ou services d'une direction, mis en cache par version
+        """
+        if model_name not in FILTER_PARENT_FIELDS:
+            raise ValueError(f"Filtre inconnu: {model_name}")
+        return self._get_filter_options_json(model_name, parent_id, self._get_version())
+
+    @tools.ormcache('model_name', 'parent_id', 'version')
+    def _get_filter_options_json(self, model_name, parent_id, version):
+        domain = PUBLISHED_DOMAIN + [(FILTER_PARENT_FIELDS[model_name], '=', parent_id)]
+        options = self.env[model_name].sudo().search_read(domain, ['name'], order='name')
+        return json.dumps(
+            [{'id': option['id'], 'name': option['name']} for option in options],
+            ensure_ascii=False,
+        ).encode('utf-8')
+
+    # ------------------------------------------------------------------
+    # Version de la hiérarchie
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _get_version(self):
+        """Version courante de la hiérarchie"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(HIERARCHY_VERSION_PARAM, '0'))
+
+    @api.model
+    def _get_last_modified(self):
+        """Date de la dernière modification de la hiérarchie (ou None)"""
+        value = self.env['ir.config_parameter'].sudo().get_param(HIERARCHY_DATE_PARAM)
+        return fields.Datetime.to_datetime(value) if value else None
+
+    @api.model
+    def _bump_version(self):
+        """Planifier l'incrément de version, une seule fois par transaction"""
+        data = self.env.cr.precommit.data
+        if data.get(HIERARCHY_VERSION_PARAM):
+            return
+        data[HIERARCHY_VERSION_PARAM] = True
+        self.env.cr.precommit.add(self._increment_version)
+
+    @api.model
+    def _increment_version(self):
+        """
+        Incrémenter la version juste avant le commit
+
+        set_param vide le cache du registre, ce qui est signalé aux autres
+        workers après le commit.
+        """
+        self.env.cr.precommit.data.pop(HIERARCHY_VERSION_PARAM, None)
+        IrConfigParameter = self.env['ir.config_parameter'].sudo()
+        IrConfigParameter.set_param(HIERARCHY_DATE_PARAM, fields.Datetime.to_string(fields.Datetime.now()))
+        IrConfigParameter.set_param(HIERARCHY_VERSION_PARAM, self._get_version() + 1)
+        self.env.flush_all()
+
+    # ------------------------------------------------------------------
+    # Compteurs
+    # ------------------------------------------------------------------
+
+    @api.model
+    def recompute_counters(self):
+        """Recalcul complet des compteurs de la hiérarchie (réparation)"""
+        everything = [('active', 'in', [True, False])]
+        self._recompute_counters({
+            model_name: self.env[model_name].sudo().search(everything)
+            for model_name in COUNTER_MODELS
+        })
+
+    @api.model
+    def _recompute_counters(self, records):
+        """
+        Recalculer en lot les compteurs des enregistrements donnés par modèle
+
+        En temps normal les compteurs sont entretenus par deltas; les
+        niveaux sont recalculés du bas vers le haut car chaque niveau
+        additionne les compteurs du niveau inférieur. Les compteurs calculés
+        (dépendances) sont replanifiés puis calculés en un seul passage.
+        Chaque niveau est écrit en une requête, sans passer par write().
+        """
+        services = records['sn.service']
+        services._set_counters({'agent_count': services._recount_agent_count()})
+        directions = records['sn.direction']
+        directions._set_counters({
+            'service_count': directions._recount_service_count(),
+            'agent_count': directions._recount_agent_count(),
+        })
+        categories = records['sn.category']
+        categories._set_counters({'direction_count': categories._recount_direction_count()})
+        ministries = records['sn.ministry']
+        ministries._set_counters({
+            'category_count': ministries._recount_category_count(),
+            'direction_count': ministries._recount_direction_count(),
+            'service_count': ministries._recount_service_count(),
+            'agent_count': ministries._recount_agent_count(),
+        })
+
+        for model_name in COUNTER_MODELS:
+            model_records = records[model_name]
+            for fname in model_records._hierarchy_computed_counters:
+                self.env.add_to_compute(model_records._fields[fname], model_records)
+        self.env.flush_all()
+        self._bump_version()
+
+    @api.model
+    def _defer_counters(self, dirty):
+        """
+        Noter les structures dont les compteurs sont à recalculer
+
+        dirty: {modèle: ids}. Les compteurs calculés de ces structures sont
+        retirés de la file de l'ORM et un seul recalcul groupé est planifié
+        avant le commit.
+        """
+        data = self.env.cr.precommit.data
+        pending = data.get(DEFERRED_COUNTERS_KEY)
+        if pending is None:
+            pending = data[DEFERRED_COUNTERS_KEY] = defaultdict(set)
+            self.env.cr.precommit.add(self._flush_deferred_counters)
+        for model_name, ids in dirty.items():
+            pending[model_name].update(ids)
+            Model = self.env[model_name]
+            for fname in Model._hierarchy_computed_counters:
+                self.env.remove_to_compute(Model._fields[fname], Model.browse(ids))
+
+    @api.model
+    def _flush_deferred_counters(self):
+        pending = self.env.cr.precommit.data.pop(DEFERRED_COUNTERS_KEY, None)
+        if not pending:
+            return
+        Hierarchy = self.sudo().with_context(sn_admin_defer_counters=False)
+        Hierarchy._recompute_counters({
+            model_name: Hierarchy.env[model_name].browse(pending.get(model_name, ())).exists()
+            for model_name in COUNTER_MODELS
+        })
+
+    # ------------------------------------------------------------------
+    # Chargement par niveau
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _normalize_levels(self, levels=None):
+        """Retourner les niveaux demandés dans l'ordre hiérarchique"""
+        if not levels:
+            return LEVELS
+        return tuple(level for level in LEVELS if level == 'ministry' or level in levels)
+
+    @api.model
+    def _parent_level(self, level, levels):
+        """Ancêtre inclus le plus proche auquel un niveau peut être rattaché"""
+        for ancestor in reversed(LEVELS[:LEVELS.index(level)]):
+            if ancestor in levels and ancestor in PARENT_FIELDS[level]:
+                return ancestor
+        return None
+
+    def _build_ministry_nodes(self, ministries, depth, levels, limits):
+        """Construire les nœuds des ministères et de leur descendance"""
+        if depth is not None and depth < 0:
+            return []
+
+        # Une catégorie est facultative: les directions peuvent se trouver
+        # au premier comme au second niveau sous le ministère
+        loaded_levels = levels
+        if depth is not None:
+            loaded_levels = levels[:depth + 1 + ('category' in levels)]
+
+        rows = {'ministry': ministries}
+        ids = {'ministry': [ministry['id'] for ministry in ministries]}
+        counts = {}
+        for level in loaded_levels[1:]:
+            parent_level = self._parent_level(level, levels)
+            if parent_level == 'category':
+                # Les directions sans catégorie restent rattachées au ministère
+                parent_level = 'ministry'
+            parent_field = PARENT_FIELDS[level][parent_level]
+            if level == 'agent':
+                # Seuls les premiers agents de chaque parent sont lus
+                rows[level], counts[parent_level] = self._read_top_agents(
+                    parent_field, ids[parent_level], limits.get('agent'),
+                )
+            else:
+                rows[level] = self.env[LEVEL_MODELS[level]].search_read(
+                    PUBLISHED_DOMAIN + [(parent_field, 'in', ids[parent_level])],
+                    LEVEL_FIELDS[level],
+                    load=None,
+                )
+            ids[level] = [row['id'] for row in rows[level]]
+
+        # Nombre d'enfants publiés par parent, une requête groupée par niveau
+        for level in loaded_levels:
+            if level not in counts:
+                counts[level] = self._children_counts(level, ids[level], levels)
+
+        # Assemblage en mémoire
+        nodes = {}
+        for level in loaded_levels:
+            nodes[level] = {}
+            for row in rows[level]:
+                node = self._make_node(row, level, LEVEL_MODELS[level])
+                if counts[level] is not None:
+                    node['children_count'] = counts[level].get(row['id'], 0)
+                nodes[level][row['id']] = node
+
+        ministries_with_categories = {row['ministry_id'] for row in rows.get('category', [])}
+
+        for level in loaded_levels[1:]:
+            parent_level = self._parent_level(level, levels)
+            parent_field = PARENT_FIELDS[level][parent_level]
+            limit = limits.get(level)
+            for row in rows[level]:
+                parent = nodes[parent_level].get(row[parent_field])
+                if parent is None and level == 'direction' and parent_level == 'category':
+                    # Si pas de catégories, afficher directement les directions
+                    if row['ministry_id'] not in ministries_with_categories:
+                        parent = nodes['ministry'].get(row['ministry_id'])
+                if parent is None:
+                    continue
+                # Limiter les enfants affichés pour la performance
+                if limit is not None and len(parent['children']) >= limit:
+                    continue
+                parent['children'].append(nodes[level][row['id']])
+
+        ministry_nodes = [nodes['ministry'][ministry['id']] for ministry in ministries]
+        if depth is not None:
+            for node in ministry_nodes:
+                self._truncate_node(node, depth)
+        return ministry_nodes
+
+    @api.model
+    def _child_level(self, level, levels):
+        """Niveau inclus immédiatement sous un niveau donné"""
+        for child_level in levels[levels.index(level) + 1:]:
+            if self._parent_level(child_level, levels) == level:
+                return child_level
+        return None
+
+    def _read_top_agents(self, parent_field, parent_ids, limit=None):
+        """
+        Lire les premiers agents publiés de chaque parent en une requête
+
+        ROW_NUMBER() limite les agents lus par parent et COUNT(*) sur la
+        même partition donne le nombre exact d'agents publiés.
+
+        :return: (lignes des agents, nombre d'agents publiés par parent)
+        """
+        if not parent_ids:
+            return [], {}
+
+        Agent = self.env['sn.agent']
+        Agent.flush_model(LEVEL_FIELDS['agent'] + ['active', 'state'])
+        query = Agent._search(PUBLISHED_DOMAIN + [(parent_field, 'in', parent_ids)])
+        parent_column = SQL.identifier(query.table, parent_field)
+        ranked = query.select(
+            *(SQL.identifier(query.table, fname) for fname in ['id'] + LEVEL_FIELDS['agent']),
+            SQL(
+                "ROW_NUMBER() OVER (PARTITION BY %s ORDER BY %s, %s) AS agent_rank",
+                parent_column,
+                SQL.identifier(query.table, 'name'),
+                SQL.identifier(query.table, 'id'),
+            ),
+            SQL("COUNT(*) OVER (PARTITION BY %s) AS agent_total", parent_column),
+        )
+        self.env.cr.execute(SQL(
+            "SELECT * FROM (%s) AS ranked WHERE %s ORDER BY %s, agent_rank",
+            ranked,
+            SQL("agent_rank <= %s", limit) if limit is not None else SQL("TRUE"),
+            SQL.identifier(parent_field),
+        ))
+        rows = self.env.cr.dictfetchall()
+        counts = {row[parent_field]: row['agent_total'] for row in rows}
+        return rows, counts
+
+    @api.model
+    def _get_agent_preview_limit(self):
+        """Nombre d'agents affichés sous un service dans l'organigramme"""
+        limit = self.env['ir.config_parameter'].sudo().get_param('sn_admin.orgchart_agent_limit')
+        return int(limit) if limit else AGENT_PREVIEW_LIMIT
+
+    def _children_counts(self, level, ids, levels=LEVELS):
+        """
+        Nombre d'enfants publiés de chaque nœud d'un niveau
+
+        Retourne None pour le dernier niveau (pas d'enfants possibles).
+        """
+        if level == 'ministry' and 'category' in levels:
+            # Catégories si le ministère en a, sinon directions
+            categories = self._count_by_parent('sn.category', 'ministry_id', ids)
+            directions = self._count_by_parent(
+                'sn.direction', 'ministry_id', [ministry_id for ministry_id in ids if not categories.get(ministry_id)],
+            )
+            return {ministry_id: categories.get(ministry_id) or directions.get(ministry_id, 0) for ministry_id in ids}
+        child_level = self._child_level(level, levels)
+        if not child_level:
+            return None
+        return self._count_by_parent(LEVEL_MODELS[child_level], PARENT_FIELDS[child_level][level], ids)
+
+    def _count_by_parent(self, model_name, parent_field, parent_ids):
+        """Compter les enregistrements publiés groupés par parent"""
+        if not parent_ids:
+            return {}
+        groups = self.env[model_name]._read_group(
+            PUBLISHED_DOMAIN + [(parent_field, 'in', parent_ids)],
+            groupby=[parent_field],
+            aggregates=['__count'],
+        )
+        return {parent.id: count for parent, count in groups}
+
+    @api.model
+    def _truncate_node(self, node, depth):
+        """Couper l'arbre sous la profondeur demandée"""
+        if depth <= 0:
+            node['children'] = []
+            return
+        for child in node['children']:
+            self._truncate_node(child, depth - 1)
+
+    @api.model
+    def _make_node(self, values, model_type, model_name):
+        """Construire un nœud de l'organigramme à partir d'une ligne lue"""
+        code = values.get('code', '')
+        return {
+            'id': values['id'],
+            'name': values['name'],
+            'code': code,
+            'title': code,
+            'type': model_type,
+            'model': model_name,
+            'children': [],
+        }
@@ -0,0 +1,224 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.osv import expression
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+
+class HierarchyMixin(models.AbstractModel):
+    _name = 'sn.hierarchy.mixin'
+    _description = 'Structure de la hiérarchie de l\'administration'
+
+    # Compteurs des parents entretenus par deltas: liste de
+    # (champ parent, {compteur du parent: 1 ou compteur de l'enregistrement})
+    _hierarchy_counters = []
+
+    # Compteurs stockés calculés par dépendances, reportés en mode différé
+    _hierarchy_computed_counters = []
+
+    # Champs rendus par l'arbre, le portail ou la recherche (avec les champs
+    # public_*): seules leurs modifications changent la version de la
+    # hiérarchie, qui invalide les caches, les ETag et l'autocomplétion
+    _hierarchy_public_fields = ['name', 'code', 'active', 'state']
+
+    # Chemin matérialisé dans la hiérarchie, ex: M12/C5/D40/S310/A9021/
+    # (ministère, catégorie, direction, service, agent); chaque modèle
+    # redéfinit le champ avec son calcul
+    hierarchy_path = fields.Char(
+        string='Chemin hiérarchique',
+        store=True,
+        readonly=True,
+        copy=False,
+    )
+
+    def init(self):
+        super().init()
+        if self._abstract:
+            return
+        # Index adapté aux recherches par préfixe (LIKE 'M12/%')
+        create_index(
+            self.env.cr,
+            f'{self._table}_hierarchy_path_index',
+            self._table,
+            ['hierarchy_path text_pattern_ops'],
+        )
+
+    def _get_subtree_domain(self):
+        """Domaine des structures situées sous ces enregistrements, à toute profondeur"""
+        return expression.OR([
+            [('hierarchy_path', '=like', f'{path}%')]
+            for path in self.filtered('hierarchy_path').mapped('hierarchy_path')
+        ])
+
+    def _get_descendants(self, model_name, domain=None):
+        """Structures d'un modèle donné situées sous ces enregistrements (une requête indexée)"""
+        return self.env[model_name].search(self._get_subtree_domain() + (domain or []))
+
+    def _get_counter_contributions(self, include_subtree=True):
+        """
+        Contribution de ces enregistrements aux compteurs de leurs ancêtres
+
+        Un enregistrement actif compte pour son parent, puis la contribution
+        remonte tant que l'ancêtre traversé est lui-même actif. Sans
+        include_subtree, seuls les poids constants sont pris en compte (à la
+        création, les enfants ont déjà propagé leur propre contribution).
+        Retourne {(modèle, id): {compteur: valeur}}.
+        """
+        contributions = defaultdict(lambda: defaultdict(int))
+        for record in self:
+            if not record.active:
+                continue
+            for parent_field, counters in record._hierarchy_counters:
+                weights = {
+                    counter: record[source] if isinstance(source, str) else source
+                    for counter, source in counters.items()
+                    if include_subtree or not isinstance(source, str)
+                }
+                record[parent_field]._push_counter_contribution(weights, contributions)
+        return contributions
+
+    def _push_counter_contribution(self, weights, contributions):
+        if not self:
+            return
+        values = contributions[self._name, self.id]
+        for counter, value in weights.items():
+            values[counter] += value
+        if not self.active:
+            return
+        for parent_field, counters in self._hierarchy_counters:
+            parent_weights = {counter: value for counter, value in weights.items() if counter in counters}
+            if parent_weights:
+                self[parent_field]._push_counter_contribution(parent_weights, contributions)
+
+    @api.model
+    def _apply_counter_deltas(self, before, after):
+        """Applique la différence de deux contributions, une requête UPDATE par modèle"""
+        deltas = defaultdict(dict)
+        for key in set(before) | set(after):
+            old, new = before.get(key, {}), after.get(key, {})
+            changes = {
+                counter: new.get(counter, 0) - old.get(counter, 0)
+                for counter in set(old) | set(new)
+            }
+            changes = {counter: delta for counter, delta in changes.items() if delta}
+            if changes:
+                model_name, res_id = key
+                deltas[model_name][res_id] = changes
+
+        for model_name, rows in deltas.items():
+            Model = self.env[model_name]
+            counters = sorted({counter for changes in rows.values() for counter in changes})
+            Model.flush_model(counters)
+            self.env.cr.execute(SQL(
+                "UPDATE %s AS t SET %s FROM (VALUES %s) AS v(%s) WHERE t.id = v.id",
+                SQL.identifier(Model._table),
+                SQL(", ").join(
+                    SQL("%s = COALESCE(t.%s, 0) + v.%s", SQL.identifier(counter), SQL.identifier(counter), SQL.identifier(counter))
+                    for counter in counters
+                ),
+                SQL(", ").join(
+                    SQL("(%s)", SQL(", ").join([res_id] + [changes.get(counter, 0) for counter in counters]))
+                    for res_id, changes in rows.items()
+                ),
+                SQL(", ").join(SQL.identifier(name) for name in ['id'] + counters),
+            ))
+            Model.invalidate_model(counters)
+
+    def _set_counters(self, values):
+        """
+        Écrire des valeurs absolues de compteurs, {compteur: {enregistrement:
+        valeur}} (0 si absent), en une requête UPDATE pour ces enregistrements
+        """
+        if not self:
+            return
+        counters = sorted(values)
+        self.flush_model(counters)
+        self.env.cr.execute(SQL(
+            "UPDATE %s AS t SET %s FROM (VALUES %s) AS v(%s) WHERE t.id = v.id",
+            SQL.identifier(self._table),
+            SQL(", ").join(SQL("%s = v.%s", SQL.identifier(counter), SQL.identifier(counter)) for counter in counters),
+            SQL(", ").join(
+                SQL("(%s)", SQL(", ").join([record.id] + [values[counter].get(record) or 0 for counter in counters]))
+                for record in self
+            ),
+            SQL(", ").join(SQL.identifier(name) for name in ['id'] + counters),
+        ))
+        self.invalidate_recordset(counters)
+
+    def _counter_fields_changed(self, vals):
+        return self._hierarchy_counters and (
+            'active' in vals or any(parent_field in vals for parent_field, _counters in self._hierarchy_counters)
+        )
+
+    def _public_fields_changed(self, vals):
+        return any(fname in self._hierarchy_public_fields or fname.startswith('public_') for fname in vals)
+
+    def _has_published(self):
+        return any(record.active and record.state == 'active' for record in self)
+
+    def _get_counter_structures(self):
+        """Ces structures et tous leurs ancêtres: {modèle: ids}"""
+        structures = defaultdict(set)
+        structures[self._name].update(self.ids)
+        for parent_field, _counters in self._hierarchy_counters:
+            parents = self.mapped(parent_field)
+            if parents:
+                for model_name, ids in parents._get_counter_structures().items():
+                    structures[model_name].update(ids)
+        return structures
+
+    def _is_counter_deferred(self):
+        """Mode différé: contexte sn_admin_defer_counters (posé au chargement de données)"""
+        return self.env.context.get('sn_admin_defer_counters')
+
+    def _load_records(self, data_list, update=False):
+        # Chargement des fichiers de données à l'installation ou la mise à jour
+        if not self.pool.ready or self.env.context.get('install_mode'):
+            self = self.with_context(sn_admin_defer_counters=True)
+        return super(HierarchyMixin, self)._load_records(data_list, update=update)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if self._is_counter_deferred():
+            self.env['sn.hierarchy']._defer_counters(records.sudo()._get_counter_structures())
+        elif self._hierarchy_counters:
+            self._apply_counter_deltas({}, records.sudo()._get_counter_contributions(include_subtree=False))
+        if records._has_published():
+            self.env['sn.hierarchy']._bump_version()
+        return records
+
+    def write(self, vals):
+        counters_changed = self._counter_fields_changed(vals)
+        if self._is_counter_deferred() and (counters_changed or 'state' in vals):
+            before = self.sudo()._get_counter_structures()
+            result = super().write(vals)
+            after = self.sudo()._get_counter_structures()
+            self.env['sn.hierarchy']._defer_counters({
+                model_name: before.get(model_name, set()) | after.get(model_name, set())
+                for model_name in set(before) | set(after)
+            })
+        elif counters_changed:
+            before = self.sudo()._get_counter_contributions()
+            result = super().write(vals)
+            self._apply_counter_deltas(before, self.sudo()._get_counter_contributions())
+        else:
+            result = super().write(vals)
+        if self._public_fields_changed(vals) or counters_changed:
+            self.env['sn.hierarchy']._bump_version()
+        return result
+
+    def unlink(self):
+        if self._has_published():
+            self.env['sn.hierarchy']._bump_version()
+        if self._is_counter_deferred():
+            structures = self.sudo()._get_counter_structures()
+            result = super().unlink()
+            self.env['sn.hierarchy']._defer_counters(structures)
+        else:
+            before = self.sudo()._get_counter_contributions() if self._hierarchy_counters else {}
+            result = super().unlink()
+            if before:
+                self._apply_counter_deltas(before, {})
+        return result
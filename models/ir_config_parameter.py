@@ -0,0 +1,46 @@
+from odoo import models, api
+
+from .hierarchy import HIERARCHY_DATE_PARAM, HIERARCHY_VERSION_PARAM
+
+
+class IrConfigParameter(models.Model):
+    _inherit = 'ir.config_parameter'
+
+    @api.model
+    def _is_sn_admin_setting(self, key):
+        """Paramètre sn_admin.* influençant le rendu public (hors compteur de version)"""
+        return bool(key) and key.startswith('sn_admin.') and key not in (HIERARCHY_VERSION_PARAM, HIERARCHY_DATE_PARAM)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(vals.get('key') == 'web.base.url' for vals in vals_list):
+            self.env['sn.qr.code']._trigger_generation()
+        if any(self._is_sn_admin_setting(vals.get('key')) for vals in vals_list):
+            self.env['sn.hierarchy']._bump_version()
+        return records
+
+    def write(self, vals):
+        # Un changement d'hôte rend toutes les URL des QR codes obsolètes
+        base_url_changed = 'value' in vals and any(
+            record.key == 'web.base.url' and record.value != vals['value'] for record in self
+        )
+        # Les réglages sn_admin.* (visibilité, API, aperçus...) changent les
+        # pages et réponses publiques: invalider leurs ETags
+        settings_changed = any(
+            self._is_sn_admin_setting(key)
+            for record in self
+            if ('value' in vals and record.value != vals['value']) or vals.get('key', record.key) != record.key
+            for key in (record.key, vals.get('key'))
+        )
+        result = super().write(vals)
+        if base_url_changed:
+            self.env['sn.qr.code']._trigger_generation()
+        if settings_changed:
+            self.env['sn.hierarchy']._bump_version()
+        return result
+
+    def unlink(self):
+        if any(self._is_sn_admin_setting(record.key) for record in self):
+            self.env['sn.hierarchy']._bump_version()
+        return super().unlink()
@@ -1,13 +1,12 @@
 from odoo import models, fields, api
-import qrcode
-import io
-import base64
+
+from .hierarchy import PUBLISHED_DOMAIN
 
 
 class Ministry(models.Model):
     _name = 'sn.ministry'
     _description = 'Ministère ou Institution Sénégalaise'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'sn.hierarchy.mixin', 'sn.qr.code.mixin', 'sn.search.mixin']
     _order = 'name'
 
     # Champs de base
@@ -15,7 +14,7 @@ class Ministry(models.Model):
         string='Nom',
         required=True,
         tracking=True,
-        index=True,
+        index='trigram',
     )
     code = fields.Char(
         string='Code',
@@ -83,12 +82,10 @@ class Ministry(models.Model):
         help='Département RH correspondant pour faciliter la gestion du personnel',
     )
 
+    # Chemin hiérarchique (voir sn.hierarchy.mixin)
+    hierarchy_path = fields.Char(compute='_compute_hierarchy_path')
+
     # Champs QR Code
-    qr_code = fields.Binary(
-        string='QR Code',
-        compute='_compute_qr_code',
-        store=True,
-    )
     qr_code_url = fields.Char(
         string='URL QR Code',
         compute='_compute_qr_code_url',
@@ -101,25 +98,45 @@ class Ministry(models.Model):
     public_show_email = fields.Boolean(string='Afficher Email', default=True)
     public_show_address = fields.Boolean(string='Afficher Adresse', default=True)
     
-    # Champs calculés
+    # Compteurs entretenus par deltas (voir sn.hierarchy.mixin)
     category_count = fields.Integer(
         string='Nombre de Catégories',
-        compute='_compute_category_count',
-        store=True,
+        readonly=True,
+        default=0,
+        copy=False,
     )
     direction_count = fields.Integer(
         string='Nombre de Directions',
-        compute='_compute_direction_count',
-        store=True,
+        readonly=True,
+        default=0,
+        copy=False,
     )
     service_count = fields.Integer(
         string='Nombre de Services',
-        compute='_compute_service_count',
-        store=True,
+        readonly=True,
+        default=0,
+        copy=False,
     )
     agent_count = fields.Integer(
         string='Nombre d\'Agents',
-        compute='_compute_agent_count',
+        readonly=True,
+        default=0,
+        copy=False,
+    )
+    # Compteurs publiés (actifs et à l'état actif), affichés sur le portail
+    published_direction_count = fields.Integer(
+        string='Directions publiées',
+        compute='_compute_published_counts',
+        store=True,
+    )
+    published_service_count = fields.Integer(
+        string='Services publiés',
+        compute='_compute_published_counts',
+        store=True,
+    )
+    published_agent_count = fields.Integer(
+        string='Agents publiés',
+        compute='_compute_published_counts',
         store=True,
     )
     employee_count = fields.Integer(
@@ -134,26 +151,90 @@ class Ministry(models.Model):
         ('name_unique', 'UNIQUE(LOWER(name))', 'Le nom doit être unique'),
     ]
 
-    @api.depends('category_ids')
-    def _compute_category_count(self):
-        for record in self:
-            record.category_count = len(record.category_ids)
+    _hierarchy_computed_counters = [
+        'published_direction_count',
+        'published_service_count',
+        'published_agent_count',
+    ]
+
+    # Champs rendus publiquement (voir sn.hierarchy.mixin)
+    _hierarchy_public_fields = [
+        'name', 'code', 'type', 'description', 'address', 'phone',
+        'email', 'website', 'active', 'state',
+    ]
+
+    # Recherche plein texte (sn.search)
+    _search_vector_fields = {
+        'A': ['name'],
+        'B': ['code'],
+        'C': ['email'],
+    }
+
+    # Recomptages complets des compteurs (réparation), un GROUP BY par
+    # compteur: {ministère: valeur}, écrits par _set_counters
+    def _recount_category_count(self):
+        return dict(self.env['sn.category'].sudo()._read_group(
+            [('ministry_id', 'in', self.ids)], ['ministry_id'], ['__count'],
+        ))
+
+    def _recount_direction_count(self):
+        return dict(self.env['sn.direction'].sudo()._read_group(
+            [('ministry_id', 'in', self.ids)], ['ministry_id'], ['__count'],
+        ))
+
+    def _recount_service_count(self):
+        return dict(self.env['sn.direction'].sudo()._read_group(
+            [('ministry_id', 'in', self.ids)], ['ministry_id'], ['service_count:sum'],
+        ))
+
+    def _recount_agent_count(self):
+        return dict(self.env['sn.direction'].sudo()._read_group(
+            [('ministry_id', 'in', self.ids)], ['ministry_id'], ['agent_count:sum'],
+        ))
     
-    @api.depends('direction_ids')
-    def _compute_direction_count(self):
+    @api.depends(
+        'direction_ids.active',
+        'direction_ids.state',
+        'direction_ids.published_service_count',
+        'direction_ids.published_agent_count',
+    )
+    def _compute_published_counts(self):
+        groups = self.env['sn.direction'].sudo()._read_group(
+            PUBLISHED_DOMAIN + [('ministry_id', 'in', self.ids)],
+            ['ministry_id'],
+            ['__count', 'published_service_count:sum', 'published_agent_count:sum'],
+        )
+        counts = {ministry: (directions, services, agents) for ministry, directions, services, agents in groups}
         for record in self:
-            record.direction_count = len(record.direction_ids)
+            (
+                record.published_direction_count,
+                record.published_service_count,
+                record.published_agent_count,
+            ) = counts.get(record, (0, 0, 0))
 
-    @api.depends('direction_ids.service_ids')
-    def _compute_service_count(self):
-        for record in self:
-            record.service_count = sum(record.direction_ids.mapped('service_count'))
+    @api.model
+    def get_published_totals(self):
+        """
+        Totaux du portail public en une seule agrégation
+
+        Compte les institutions publiées et additionne leurs compteurs
+        publiés; retourne aussi le nombre d'institutions par type.
+        """
+        Ministry = self.sudo()
+        [(ministries, directions, services, agents)] = Ministry._read_group(
+            PUBLISHED_DOMAIN,
+            [],
+            ['__count', 'published_direction_count:sum', 'published_service_count:sum', 'published_agent_count:sum'],
+        )
+        by_type = dict(Ministry._read_group(PUBLISHED_DOMAIN, ['type'], ['__count']))
+        return {
+            'ministries': ministries,
+            'directions': directions or 0,
+            'services': services or 0,
+            'agents': agents or 0,
+            'by_type': by_type,
+        }
 
-    @api.depends('direction_ids.service_ids.agent_ids')
-    def _compute_agent_count(self):
-        for record in self:
-            record.agent_count = sum(record.direction_ids.mapped('agent_count'))
-    
     @api.depends('department_id.total_employee')
     def _compute_employee_count(self):
         for record in self:
@@ -162,6 +243,11 @@ class Ministry(models.Model):
             else:
                 record.employee_count = 0
     
+    @api.depends()
+    def _compute_hierarchy_path(self):
+        for record in self:
+            record.hierarchy_path = f'M{record.id}/' if record.id else False
+    
     @api.depends('name')
     def _compute_qr_code_url(self):
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
@@ -171,20 +257,6 @@ class Ministry(models.Model):
             else:
                 record.qr_code_url = False
     
-    @api.depends('qr_code_url')
-    def _compute_qr_code(self):
-        for record in self:
-            if record.qr_code_url:
-                qr = qrcode.QRCode(version=1, box_size=10, border=5)
-                qr.add_data(record.qr_code_url)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                record.qr_code = base64.b64encode(buffer.getvalue())
-            else:
-                record.qr_code = False
-
     def action_view_directions(self):
         self.ensure_one()
         return {
@@ -280,61 +352,17 @@ class Ministry(models.Model):
         self.ensure_one()
         return self.env.ref('sn_admin.action_report_organigramme').report_action(self)
     
-    def get_orgchart_data(self, ministry_id=None):
+    def action_download_qr_codes(self):
+        """Télécharger les QR codes des structures et agents (ZIP ou PDF selon le contexte)"""
+        fmt = self.env.context.get('qr_sheet_format', 'zip')
+        return self.env['sn.qr.code']._get_sheet_action(self, fmt)
+    
+    def get_orgchart_data(self, ministry_id=None, depth=None):
         """
         Retourne les données hiérarchiques pour l'organigramme interactif
         Compatible avec OrgChart.js
         """
-        def build_node(record, model_type):
-            """Construire un nœud de l'organigramme"""
-            node = {
-                'id': record.id,
-                'name': record.name,
-                'code': record.code if hasattr(record, 'code') else '',
-                'title': record.code if hasattr(record, 'code') else '',
-                'type': model_type,
-                'model': record._name,
-                'children': []
-            }
-            
-            # Ajouter les enfants selon le type
-            if model_type == 'ministry':
-                node['children_count'] = len(record.direction_ids)
-                for direction in record.direction_ids.filtered(lambda d: d.active and d.state == 'active'):
-                    node['children'].append(build_node(direction, 'direction'))
-            elif model_type == 'direction':
-                node['children_count'] = len(record.service_ids)
-                for service in record.service_ids.filtered(lambda s: s.active and s.state == 'active'):
-                    node['children'].append(build_node(service, 'service'))
-            elif model_type == 'service':
-                node['children_count'] = len(record.agent_ids)
-                # Limiter les agents affichés pour la performance
-                for agent in record.agent_ids.filtered(lambda a: a.active and a.state == 'active')[:10]:
-                    node['children'].append(build_node(agent, 'agent'))
-            
-            return node
-        
-        # Construire l'arbre
-        if ministry_id:
-            ministry = self.browse(ministry_id)
-            if ministry.exists():
-                return build_node(ministry, 'ministry')
-            else:
-                return {}
-        else:
-            # Arbre complet (limité aux ministères)
-            tree_data = {
-                'id': 0,
-                'name': 'Administration Sénégalaise',
-                'title': 'SENEGAL',
-                'type': 'root',
-                'children': []
-            }
-            
-            for ministry in self.search([('active', '=', True), ('state', '=', 'active')], order='type, name'):
-                tree_data['children'].append(build_node(ministry, 'ministry'))
-            
-            return tree_data
+        return self.env['sn.hierarchy'].get_tree(ministry_id=ministry_id, depth=depth)
     
     def name_get(self):
         result = []
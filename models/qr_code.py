@@ -0,0 +1,611 @@
+import base64
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import textwrap
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import repeat
+
+import qrcode
+import qrcode.image.svg
+
+import odoo.addons
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+
+# Taille par défaut en pixels (paramètre sn_admin.qr_code_size)
+QR_CODE_SIZE = 150
+QR_CODE_MIN_SIZE = 32
+QR_CODE_MAX_SIZE = 2048
+# Tailles servies en plus de celle des paramètres: chaque taille est une
+# image en cache par URL et par format, la liste reste donc fermée
+QR_CODE_SIZES = (64, 150, 300, 600, 1200)
+QR_CODE_BORDER = 4
+
+# Formats: PNG 1 bit (noir et blanc, compressé) ou SVG vectoriel pour l'impression
+QR_CODE_MIMETYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Modèles portant un QR code
+QR_CODE_MODELS = ('sn.ministry', 'sn.direction', 'sn.service', 'sn.agent')
+
+# Génération en lot: taille des lots écrits, nombre de créations à partir
+# duquel elle est déclenchée, nombre d'images à partir duquel le rendu
+# passe dans un pool de processus, et marge de relecture des créations
+# (une transaction validée après le dernier passage peut porter une
+# create_date antérieure)
+QR_CODE_BATCH_SIZE = 500
+QR_CODE_BULK_THRESHOLD = 200
+QR_CODE_POOL_THRESHOLD = 200
+QR_CODE_SYNC_MARGIN = timedelta(minutes=10)
+
+# Planches de QR codes d'un ministère ou d'une catégorie
+QR_SHEET_FORMATS = {
+    'zip': 'application/zip',
+    'pdf': 'application/pdf',
+}
+QR_SHEET_SCOPES = ('sn.ministry', 'sn.category')
+
+# Étiquettes A4 3 x 8 (70 x 37 mm), en points
+QR_LABEL_PAGE = (595.28, 841.89)
+QR_LABEL_COLUMNS = 3
+QR_LABEL_ROWS = 8
+QR_LABEL_PADDING = 8
+QR_LABEL_LINE_WIDTH = 20
+QR_LABEL_NAME_LINES = 4
+
+
+def render_qr_code(url, size=QR_CODE_SIZE, fmt='png'):
+    """
+    Rendu d'un QR code (bytes), sans accès à l'ORM
+
+    La taille des modules est choisie pour approcher size pixels, bordure
+    comprise. Le PNG est une image 1 bit optimisée; le SVG est un chemin
+    unique, net à toute taille d'impression.
+    """
+    qr = qrcode.QRCode(border=QR_CODE_BORDER)
+    qr.add_data(url)
+    qr.make(fit=True)
+    qr.box_size = max(1, size // (qr.modules_count + 2 * QR_CODE_BORDER))
+    buffer = io.BytesIO()
+    if fmt == 'svg':
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        img = qr.make_image(fill_color="black", back_color="white").get_image()
+        img.convert('1').save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def qr_code_matrix(url):
+    """Modules du QR code (lignes de booléens, bordure comprise)"""
+    qr = qrcode.QRCode(border=QR_CODE_BORDER)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+class _ChunkWriter:
+    """Fichier en écriture seule, vidé par le flux après chaque entrée"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(entries):
+    """
+    Archive ZIP écrite au fil de l'eau à partir de (nom, bytes)
+
+    Le fichier n'est pas positionnable: zipfile écrit alors des
+    descripteurs de données et seule l'entrée courante est en mémoire.
+    Les images sont déjà compressées, elles sont stockées telles quelles.
+    """
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield writer.pop()
+    yield writer.pop()
+
+
+def _pdf_text(text):
+    text = text.encode('cp1252', errors='replace')
+    return b'(' + text.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _label_content(x, y, width, height, matrix, lines):
+    """Opérateurs PDF d'une étiquette: QR code vectoriel et texte à droite"""
+    qr_size = height - 2 * QR_LABEL_PADDING
+    module = qr_size / len(matrix)
+    top = y + height - QR_LABEL_PADDING
+    ops = []
+    for row, modules in enumerate(matrix):
+        # Une bande par suite de modules noirs
+        col = 0
+        while col < len(modules):
+            if not modules[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(modules) and modules[col]:
+                col += 1
+            ops.append(b'%.2f %.2f %.2f %.2f re' % (
+                x + QR_LABEL_PADDING + start * module, top - (row + 1) * module, (col - start) * module, module,
+            ))
+    ops.append(b'f')
+
+    text_x = x + qr_size + 2 * QR_LABEL_PADDING
+    ops.append(b'BT /F1 8 Tf 10 TL %.2f %.2f Td' % (text_x, y + height - QR_LABEL_PADDING - 8))
+    for index, line in enumerate(lines):
+        if index:
+            ops.append(b'T*')
+        ops.append(_pdf_text(line) + b' Tj')
+    ops.append(b'ET')
+    return b'\n'.join(ops)
+
+
+def iter_label_pdf(labels):
+    """
+    Planche d'étiquettes PDF écrite au fil de l'eau
+
+    labels: itérable de (matrice du QR code, lignes de texte). Chaque page
+    est écrite dès qu'elle est pleine; seuls les positions des objets et
+    les numéros des pages sont conservés jusqu'à la table de références
+    finale.
+    """
+    page_width, page_height = QR_LABEL_PAGE
+    label_width = page_width / QR_LABEL_COLUMNS
+    label_height = page_height / QR_LABEL_ROWS
+    per_page = QR_LABEL_COLUMNS * QR_LABEL_ROWS
+
+    offsets = {}
+    position = 0
+
+    def write(number, body):
+        nonlocal position
+        offsets[number] = position
+        data = b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        position += len(data)
+        return data
+
+    # 1: catalogue, 2: arbre des pages (écrit à la fin), 3: police
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    position = len(header)
+    yield header
+    yield write(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    yield write(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    pages = []
+
+    def write_page(contents):
+        number = 4 + 2 * len(pages)
+        pages.append(number)
+        stream = zlib.compress(b'\n'.join(contents))
+        page = write(number, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+                             b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>'
+                     % (page_width, page_height, number + 1))
+        content = write(number + 1, b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream'
+                        % (len(stream), stream))
+        return page + content
+
+    contents = []
+    for matrix, lines in labels:
+        index = len(contents)
+        column, row = index % QR_LABEL_COLUMNS, index // QR_LABEL_COLUMNS
+        x = column * label_width
+        y = page_height - (row + 1) * label_height
+        contents.append(_label_content(x, y, label_width, label_height, matrix, lines))
+        if len(contents) == per_page:
+            yield write_page(contents)
+            contents = []
+    if contents or not pages:
+        yield write_page(contents)
+
+    kids = b' '.join(b'%d 0 R' % number for number in pages)
+    yield write(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(pages)))
+
+    size = max(offsets) + 1
+    xref = [b'xref\n0 %d\n' % size, b'0000000000 65535 f \n']
+    xref += [b'%010d 00000 n \n' % offsets[number] for number in range(1, size)]
+    yield b''.join(xref)
+    yield b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (size, position)
+
+
+class QrCode(models.AbstractModel):
+    _name = 'sn.qr.code'
+    _description = 'Génération et cache des QR codes'
+
+    def init(self):
+        super().init()
+        # Les anciens QR codes stockés par enregistrement ne sont plus utilisés
+        self.env['ir.attachment'].sudo().search([
+            ('res_model', 'in', ['sn.ministry', 'sn.direction', 'sn.service', 'sn.agent']),
+            ('res_field', '=', 'qr_code'),
+        ]).unlink()
+        # Recherche des images du cache par nom (seul (res_model, res_id) est indexé)
+        create_index(
+            self.env.cr,
+            'ir_attachment_sn_qr_code_name_index',
+            'ir_attachment',
+            ['name'],
+            where=f"res_model = '{self._name}'",
+        )
+
+    @api.model
+    def _get_default_size(self):
+        """Taille des paramètres, bornée"""
+        size = self.env['ir.config_parameter'].sudo().get_param('sn_admin.qr_code_size') or QR_CODE_SIZE
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            size = QR_CODE_SIZE
+        return min(max(size, QR_CODE_MIN_SIZE), QR_CODE_MAX_SIZE)
+
+    @api.model
+    def _get_size(self, size=None):
+        """
+        Taille autorisée la plus proche de celle demandée (celle des
+        paramètres ou une des tailles prédéfinies), sinon celle des paramètres
+
+        Une taille quelconque reçue d'une URL publique (?size=) ne crée
+        ainsi jamais de nouvelle image en cache.
+        """
+        default = self._get_default_size()
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return default
+        if size <= 0:
+            return default
+        return min(sorted({default, *QR_CODE_SIZES}), key=lambda allowed: abs(allowed - size))
+
+    @api.model
+    def _get_cache_key(self, url, size, fmt):
+        return hashlib.sha256(f'{url}|{size}|{fmt}'.encode('utf-8')).hexdigest()
+
+    @api.model
+    def _get_attachment_name(self, key, fmt):
+        return f'sn_admin_qr_{key}.{fmt}'
+
+    @api.model
+    def get_image(self, url, size=None, fmt='png'):
+        """
+        Image d'un QR code (bytes), générée au premier accès
+
+        Les images sont mises en cache dans ir.attachment, adressées par un
+        hash de l'URL, de la taille et du format: une même demande ne
+        déclenche jamais deux rendus. Une demande anonyme (site public) lit
+        le cache mais ne l'écrit pas: l'image manquante est rendue à la
+        volée, le cache étant rempli par les utilisateurs connectés et le
+        cron de génération.
+        """
+        if fmt not in QR_CODE_MIMETYPES:
+            raise ValueError(f"Format de QR code inconnu: {fmt}")
+        size = self._get_size(size)
+        name = self._get_attachment_name(self._get_cache_key(url, size, fmt), fmt)
+
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment.search([('res_model', '=', self._name), ('name', '=', name)], limit=1)
+        if attachment:
+            return attachment.raw
+
+        image = render_qr_code(url, size, fmt)
+        if not self.env.user._is_public():
+            Attachment.create(self._prepare_attachment_values(name, url, image, fmt))
+        return image
+
+    @api.model
+    def _get_images(self, urls, size=None, fmt='png'):
+        """Images de plusieurs URL ({url: bytes}); les absentes du cache sont rendues en lot"""
+        size = self._get_size(size)
+        names = {url: self._get_attachment_name(self._get_cache_key(url, size, fmt), fmt) for url in urls}
+        Attachment = self.env['ir.attachment'].sudo()
+        cached = {
+            attachment.name: attachment.raw
+            for attachment in Attachment.search([('res_model', '=', self._name), ('name', 'in', list(names.values()))])
+        }
+        images = {url: cached[name] for url, name in names.items() if name in cached}
+        missing = [url for url in names if url not in images]
+        for batch, batch_images in self._render_batches(missing, size, fmt):
+            Attachment.create([
+                self._prepare_attachment_values(names[url], url, image, fmt)
+                for url, image in zip(batch, batch_images)
+            ])
+            images.update(zip(batch, batch_images))
+        return images
+
+    @api.model
+    def _prepare_attachment_values(self, name, url, image, fmt):
+        # L'URL est conservée pour purger le cache quand elle devient obsolète
+        return {
+            'name': name,
+            'description': url,
+            'res_model': self._name,
+            'raw': image,
+            'mimetype': QR_CODE_MIMETYPES[fmt],
+        }
+
+    @api.model
+    def _trigger_generation(self):
+        """Planifier la génération en lot (cron sans échéance, déclenché immédiatement)"""
+        cron = self.env.ref('sn_admin.ir_cron_sn_qr_code_generate', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _cron_generate_qr_codes(self, size=None, fmt='png'):
+        """
+        Génération en lot après un import en masse ou un changement d'hôte
+
+        Les URL périmées (web.base.url modifié) sont recalculées, les images
+        en cache des URL qui ne sont plus celles d'aucun enregistrement sont
+        supprimées, puis sont rendues d'avance, par lots et sur tous les
+        cœurs: les images des enregistrements créés depuis le dernier
+        passage, et celles des enregistrements dont l'ancienne URL était en
+        cache. L'avancement est remonté au cron.
+        """
+        size = self._get_size(size)
+        urls = self._refresh_qr_code_urls()
+        self._purge_cache()
+
+        urls += self._get_created_urls()
+        names = {
+            url: self._get_attachment_name(self._get_cache_key(url, size, fmt), fmt)
+            for url in urls
+        }
+        Attachment = self.env['ir.attachment'].sudo()
+        cached = set()
+        for batch in tools.split_every(QR_CODE_BATCH_SIZE * 10, list(names.values())):
+            cached.update(Attachment.search([
+                ('res_model', '=', self._name),
+                ('name', 'in', list(batch)),
+            ]).mapped('name'))
+        missing = [url for url, name in names.items() if name not in cached]
+        if not missing:
+            return
+
+        _logger.info("QR codes: génération de %d images (%d déjà en cache)", len(missing), len(cached))
+        Cron = self.env['ir.cron']
+        done = 0
+        for batch, images in self._render_batches(missing, size, fmt):
+            Attachment.create([
+                self._prepare_attachment_values(names[url], url, image, fmt)
+                for url, image in zip(batch, images)
+            ])
+            done += len(batch)
+            Cron._notify_progress(done=done, remaining=len(missing) - done)
+
+    @api.model
+    def _get_created_urls(self):
+        """URL des enregistrements créés depuis le dernier passage du cron (ou depuis un jour)"""
+        cron = self.env.ref('sn_admin.ir_cron_sn_qr_code_generate', raise_if_not_found=False)
+        since = (cron and cron.sudo().lastcall) or fields.Datetime.now() - timedelta(days=1)
+        since -= QR_CODE_SYNC_MARGIN
+        urls = []
+        for model_name in QR_CODE_MODELS:
+            Model = self.env[model_name].sudo().with_context(active_test=False)
+            urls += Model.search([('create_date', '>=', since), ('qr_code_url', '!=', False)]).mapped('qr_code_url')
+        return urls
+
+    @api.model
+    def _purge_cache(self):
+        """Supprimer les images en cache dont l'URL n'est plus celle d'aucun enregistrement"""
+        current_urls = []
+        for model_name in QR_CODE_MODELS:
+            Model = self.env[model_name]
+            Model.flush_model(['qr_code_url'])
+            current_urls.append(SQL(
+                "SELECT qr_code_url FROM %s WHERE qr_code_url IS NOT NULL",
+                SQL.identifier(Model._table),
+            ))
+        rows = self.env.execute_query(SQL(
+            """
+            SELECT id FROM ir_attachment
+             WHERE res_model = %s AND res_field IS NULL
+               AND (description IS NULL OR description NOT IN (%s))
+            """,
+            self._name,
+            SQL(" UNION ").join(current_urls),
+        ))
+        Attachment = self.env['ir.attachment'].sudo()
+        for batch in tools.split_every(QR_CODE_BATCH_SIZE, [attachment_id for attachment_id, in rows], Attachment.browse):
+            batch.unlink()
+        if rows:
+            _logger.info("QR codes: %d images obsolètes supprimées du cache", len(rows))
+
+    @api.model
+    def _render_batches(self, urls, size, fmt):
+        """Rendre les images par lots: [(urls du lot, images)]"""
+        batches = list(tools.split_every(QR_CODE_BATCH_SIZE, urls, list))
+        if len(urls) < QR_CODE_POOL_THRESHOLD:
+            for batch in batches:
+                yield batch, [render_qr_code(url, size, fmt) for url in batch]
+            return
+
+        # Processus neufs issus d'un forkserver: un fork du worker hériterait
+        # des verrous tenus par ses autres threads. Ils ne connaissent pas les
+        # chemins d'addons de la configuration, ajoutés avant de recevoir
+        # render_qr_code.
+        addons_path = f"import odoo.addons; odoo.addons.__path__.extend({list(odoo.addons.__path__)!r})"
+        with ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=exec,
+            initargs=(addons_path,),
+        ) as executor:
+            for batch in batches:
+                yield batch, list(executor.map(render_qr_code, batch, repeat(size), repeat(fmt), chunksize=50))
+
+    @api.model
+    def stream_sheet(self, scope, fmt='zip', size=None):
+        """
+        Planche des QR codes d'un ministère ou d'une catégorie: archive ZIP
+        des images PNG ou PDF d'étiquettes
+
+        Retourne un générateur pour une réponse HTTP en flux; comme
+        sn.hierarchy.stream_tree, il ouvre son propre curseur et traite les
+        enregistrements par lots, de sorte que la mémoire reste stable quel
+        que soit le nombre de QR codes.
+        """
+        if scope._name not in QR_SHEET_SCOPES or fmt not in QR_SHEET_FORMATS:
+            raise ValueError(f"Planche de QR codes inconnue: {scope._name}, {fmt}")
+        registry = self.env.registry
+        uid, context, su = self.env.uid, dict(self.env.context), self.env.su
+        model_name, res_id = scope._name, scope.id
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context, su=su)
+                yield from env['sn.qr.code']._iter_sheet_chunks(env[model_name].browse(res_id), fmt, size)
+
+        return generate()
+
+    @api.model
+    def _iter_sheet_chunks(self, scope, fmt='zip', size=None):
+        """Morceaux (bytes) de la planche de QR codes de scope"""
+        if fmt == 'pdf':
+            return iter_label_pdf(
+                (qr_code_matrix(record.qr_code_url), record._get_qr_code_label())
+                for record in self._iter_sheet_records(scope)
+            )
+        return iter_zip(self._iter_sheet_images(scope, size))
+
+    @api.model
+    def _iter_sheet_records(self, scope):
+        """Structures et agents situés sous scope, dans l'ordre de la hiérarchie, lot par lot"""
+        for model_name in QR_CODE_MODELS:
+            Model = self.env[model_name]
+            ids = Model.search(
+                scope._get_subtree_domain() + [('qr_code_url', '!=', False)], order='hierarchy_path, id',
+            ).ids
+            for batch in tools.split_every(QR_CODE_BATCH_SIZE, ids, Model.browse):
+                yield from batch
+                # Seul le lot courant reste en mémoire
+                self.env.invalidate_all()
+
+    @api.model
+    def _iter_sheet_images(self, scope, size=None):
+        """Entrées (nom, PNG) de l'archive, un dossier par type de structure"""
+        names = set()
+        for batch in tools.split_every(QR_CODE_BATCH_SIZE, self._iter_sheet_records(scope)):
+            images = self._get_images([record.qr_code_url for record in batch], size, 'png')
+            for record in batch:
+                model_name = record._name.split('.')[-1]
+                name = f'{model_name}/qrcode_{model_name}_{record._get_qr_code_reference() or record.id}.png'
+                if name in names:
+                    name = f'{name[:-4]}_{record.id}.png'
+                names.add(name)
+                yield name, images[record.qr_code_url]
+
+    @api.model
+    def _get_sheet_action(self, scope, fmt):
+        """Action de téléchargement de la planche de QR codes de scope"""
+        scope.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/organigramme/qrcode/sheet/{scope._name}/{scope.id}?format={fmt}',
+            'target': 'self',
+        }
+
+    @api.model
+    def _refresh_qr_code_urls(self):
+        """
+        Recalculer les URL qui ne pointent pas vers l'hôte courant
+
+        Retourne les nouvelles URL des enregistrements dont l'ancienne image
+        était en cache, à rendre de nouveau.
+        """
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        self.env['ir.attachment'].flush_model(['res_model', 'description'])
+        cached_urls = {url for url, in self.env.execute_query(SQL(
+            "SELECT DISTINCT description FROM ir_attachment WHERE res_model = %s AND description IS NOT NULL",
+            self._name,
+        ))}
+        urls = []
+        for model_name in QR_CODE_MODELS:
+            Model = self.env[model_name].sudo().with_context(active_test=False)
+            stale = Model.search(['|', ('qr_code_url', '=', False), '!', ('qr_code_url', '=like', f'{base_url}/%')])
+            for batch in tools.split_every(QR_CODE_BATCH_SIZE, stale.ids, Model.browse):
+                viewed = batch.filtered(lambda record: record.qr_code_url in cached_urls)
+                self.env.add_to_compute(Model._fields['qr_code_url'], batch)
+                batch.flush_recordset(['qr_code_url'])
+                batch.invalidate_recordset(['qr_code_url'])
+                urls += viewed.mapped('qr_code_url')
+            if stale:
+                _logger.info("QR codes: %d URL recalculées pour %s", len(stale), model_name)
+        return urls
+
+
+class QrCodeMixin(models.AbstractModel):
+    _name = 'sn.qr.code.mixin'
+    _description = 'QR code d\'une structure'
+
+    qr_code_url = fields.Char(string='URL QR Code')
+    # Image non stockée: calculée à la lecture depuis le cache de sn.qr.code
+    qr_code = fields.Binary(
+        string='QR Code',
+        compute='_compute_qr_code',
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # Import en masse: préparer les images hors de la requête
+        if len(records) >= QR_CODE_BULK_THRESHOLD:
+            self.env['sn.qr.code']._trigger_generation()
+        return records
+
+    @api.depends('qr_code_url')
+    def _compute_qr_code(self):
+        for record in self:
+            record.qr_code = base64.b64encode(record._get_qr_code_image()) if record.qr_code_url else False
+
+    def _get_qr_code_image(self, size=None, fmt='png'):
+        """Image du QR code de l'enregistrement (bytes)"""
+        self.ensure_one()
+        return self.env['sn.qr.code'].get_image(self.qr_code_url, size=size, fmt=fmt)
+
+    def _get_qr_code_reference(self):
+        """Référence imprimée avec le QR code: code de la structure ou matricule"""
+        self.ensure_one()
+        return self.code if 'code' in self._fields else self.matricule
+
+    def _get_qr_code_label(self):
+        """Lignes de texte d'une étiquette: nom (tronqué) puis référence"""
+        self.ensure_one()
+        lines = textwrap.wrap(self.name or '', QR_LABEL_LINE_WIDTH) or ['']
+        if len(lines) > QR_LABEL_NAME_LINES:
+            lines = lines[:QR_LABEL_NAME_LINES]
+            lines[-1] = lines[-1][:QR_LABEL_LINE_WIDTH - 1] + '…'
+        reference = self._get_qr_code_reference()
+        return lines + [reference] if reference else lines
+
+    def get_qr_code_data_uri(self, size=None, fmt='svg'):
+        """QR code en data URI, pour les rapports PDF (SVG par défaut)"""
+        self.ensure_one()
+        if not self.qr_code_url:
+            return False
+        image = base64.b64encode(self._get_qr_code_image(size=size, fmt=fmt)).decode()
+        return f'data:{QR_CODE_MIMETYPES[fmt]};base64,{image}'
@@ -23,6 +23,12 @@ class ResConfigSettings(models.TransientModel):
         default=150,
         help='Taille des QR codes en pixels',
     )
+    sn_admin_orgchart_agent_limit = fields.Integer(
+        string='Agents affichés par service',
+        config_parameter='sn_admin.orgchart_agent_limit',
+        default=10,
+        help='Nombre maximum d\'agents affichés sous chaque service dans l\'organigramme',
+    )
     sn_admin_public_portal_enabled = fields.Boolean(
         string='Activer le portail public',
         config_parameter='sn_admin.public_portal_enabled',
@@ -48,3 +54,11 @@ class ResConfigSettings(models.TransientModel):
         config_parameter='sn_admin.enable_api',
         default=False,
     )
+
+    def set_values(self):
+        super().set_values()
+        # Les paramètres d'affichage modifient le rendu du portail public
+        self.env['sn.hierarchy']._bump_version()
+
+    def action_recompute_counters(self):
+        self.env['sn.hierarchy'].recompute_counters()
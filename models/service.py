@@ -1,14 +1,13 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
-import qrcode
-import io
-import base64
+
+from .hierarchy import PUBLISHED_DOMAIN
 
 
 class Service(models.Model):
     _name = 'sn.service'
     _description = 'Service, Bureau ou Cellule'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'sn.hierarchy.mixin', 'sn.qr.code.mixin', 'sn.search.mixin']
     _order = 'direction_id, name'
 
     # Champs de base
@@ -16,7 +15,7 @@ class Service(models.Model):
         string='Nom',
         required=True,
         tracking=True,
-        index=True,
+        index='trigram',
     )
     code = fields.Char(
         string='Code',
@@ -60,6 +59,13 @@ class Service(models.Model):
         store=True,
         index=True,
     )
+    category_id = fields.Many2one(
+        comodel_name='sn.category',
+        string='Catégorie',
+        related='direction_id.category_id',
+        store=True,
+        index=True,
+    )
     manager_id = fields.Many2one(
         comodel_name='hr.employee',
         string='Responsable',
@@ -94,12 +100,10 @@ class Service(models.Model):
     gps_latitude = fields.Float(string='Latitude GPS', digits=(10, 7))
     gps_longitude = fields.Float(string='Longitude GPS', digits=(10, 7))
 
+    # Chemin hiérarchique (voir sn.hierarchy.mixin)
+    hierarchy_path = fields.Char(compute='_compute_hierarchy_path')
+
     # Champs QR Code
-    qr_code = fields.Binary(
-        string='QR Code',
-        compute='_compute_qr_code',
-        store=True,
-    )
     qr_code_url = fields.Char(
         string='URL QR Code',
         compute='_compute_qr_code_url',
@@ -115,7 +119,14 @@ class Service(models.Model):
     # Champs calculés
     agent_count = fields.Integer(
         string='Nombre d\'Agents',
-        compute='_compute_agent_count',
+        readonly=True,
+        default=0,
+        copy=False,
+    )
+    # Compteur publié (agents actifs et à l'état actif), affiché sur le portail
+    published_agent_count = fields.Integer(
+        string='Agents publiés',
+        compute='_compute_published_agent_count',
         store=True,
     )
     employee_count = fields.Integer(
@@ -129,11 +140,38 @@ class Service(models.Model):
         ('code_direction_unique', 'UNIQUE(code, direction_id)', 'Le code doit être unique par direction'),
     ]
 
-    @api.depends('agent_ids')
-    def _compute_agent_count(self):
-        for record in self:
-            record.agent_count = len(record.agent_ids)
+    _hierarchy_counters = [
+        ('direction_id', {'service_count': 1, 'agent_count': 'agent_count'}),
+    ]
+    _hierarchy_computed_counters = ['published_agent_count']
+
+    # Champs rendus publiquement (voir sn.hierarchy.mixin)
+    _hierarchy_public_fields = [
+        'name', 'code', 'type', 'direction_id', 'ministry_id', 'category_id',
+        'manager_id', 'phone', 'email', 'active', 'state',
+    ]
+
+    # Recherche plein texte (sn.search)
+    _search_vector_fields = {
+        'A': ['name'],
+        'B': ['code'],
+        'C': ['email'],
+    }
+
+    def _recount_agent_count(self):
+        """Recomptage complet (réparation) du nombre d'agents: {service: valeur}"""
+        return dict(self.env['sn.agent'].sudo()._read_group(
+            [('service_id', 'in', self.ids)], ['service_id'], ['__count'],
+        ))
     
+    @api.depends('agent_ids.active', 'agent_ids.state')
+    def _compute_published_agent_count(self):
+        counts = dict(self.env['sn.agent'].sudo()._read_group(
+            PUBLISHED_DOMAIN + [('service_id', 'in', self.ids)], ['service_id'], ['__count'],
+        ))
+        for record in self:
+            record.published_agent_count = counts.get(record, 0)
+
     @api.depends('department_id.total_employee')
     def _compute_employee_count(self):
         for record in self:
@@ -142,6 +180,12 @@ class Service(models.Model):
             else:
                 record.employee_count = 0
     
+    @api.depends('direction_id.hierarchy_path')
+    def _compute_hierarchy_path(self):
+        for record in self:
+            parent_path = record.direction_id.hierarchy_path or ''
+            record.hierarchy_path = f'{parent_path}S{record.id}/' if record.id else False
+    
     @api.depends('name')
     def _compute_qr_code_url(self):
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
@@ -151,20 +195,6 @@ class Service(models.Model):
             else:
                 record.qr_code_url = False
     
-    @api.depends('qr_code_url')
-    def _compute_qr_code(self):
-        for record in self:
-            if record.qr_code_url:
-                qr = qrcode.QRCode(version=1, box_size=10, border=5)
-                qr.add_data(record.qr_code_url)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                record.qr_code = base64.b64encode(buffer.getvalue())
-            else:
-                record.qr_code = False
-
     @api.constrains('direction_id')
     def _check_direction_active(self):
         for record in self:
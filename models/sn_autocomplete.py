@@ -0,0 +1,258 @@
+import re
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from datetime import timedelta
+
+from odoo import models, api
+
+from .hierarchy import PUBLISHED_DOMAIN
+from .sn_search import SEARCH_URLS
+
+# Longueur minimale des préfixes
+AUTOCOMPLETE_MIN_LENGTH = 3
+
+# Modèles indexés et champs dont les mots sont indexés, dans l'ordre
+# d'affichage des suggestions
+AUTOCOMPLETE_FIELDS = {
+    'sn.ministry': ['name'],
+    'sn.category': ['name'],
+    'sn.direction': ['name'],
+    'sn.service': ['name'],
+    'sn.agent': ['name', 'function'],
+}
+
+# Marge de relecture des modifications: une transaction validée après la
+# dernière synchronisation peut porter une write_date antérieure
+AUTOCOMPLETE_SYNC_MARGIN = timedelta(minutes=10)
+
+# Au-delà de ce nombre d'enregistrements modifiés, l'index est reconstruit
+# plutôt que mis à jour (chaque insertion décale les tableaux triés)
+AUTOCOMPLETE_REBUILD_THRESHOLD = 1000
+
+# Index par base de données, propres à chaque worker
+_indexes = {}
+_indexes_lock = threading.RLock()
+
+
+def normalize_tokens(text):
+    """Mots en minuscules et sans accents ("Ministère" -> ["ministere"])"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    return re.findall(r'[^\W_]+', text)
+
+
+class PrefixIndex:
+    """
+    Index de préfixes en mémoire: tableaux triés des mots et des entrées
+    qui les contiennent, parcourus par bisection
+
+    Les entrées sont {(modèle, id): (mots, suggestion)}; chaque mot est
+    internalisé et chaque clé d'entrée partagée, de sorte qu'une occurrence
+    ne coûte que deux pointeurs. Le nombre d'entrées par modèle est tenu à
+    jour à chaque ajout et suppression.
+    """
+
+    def __init__(self, version, synced_at):
+        self.version = version
+        self.synced_at = synced_at
+        self.tokens = []
+        self.keys = []
+        self.entries = {}
+        self.counts = Counter()
+
+    @classmethod
+    def build(cls, version, synced_at, entries):
+        index = cls(version, synced_at)
+        postings = []
+        for key, tokens, suggestion in entries:
+            index.entries[key] = (tokens, suggestion)
+            index.counts[key[0]] += 1
+            postings += [(token, key) for token in tokens]
+        postings.sort()
+        index.tokens = [token for token, _key in postings]
+        index.keys = [key for _token, key in postings]
+        return index
+
+    def count(self, model_name):
+        return self.counts[model_name]
+
+    def add(self, key, tokens, suggestion):
+        self.remove(key)
+        key = (sys.intern(key[0]), key[1])
+        self.entries[key] = (tokens, suggestion)
+        self.counts[key[0]] += 1
+        for token in tokens:
+            position = bisect_left(self.tokens, token)
+            # Clés triées à mot égal, comme après build()
+            while position < len(self.tokens) and self.tokens[position] == token and self.keys[position] < key:
+                position += 1
+            self.tokens.insert(position, token)
+            self.keys.insert(position, key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if not entry:
+            return
+        self.counts[key[0]] -= 1
+        for token in entry[0]:
+            position = bisect_left(self.tokens, token)
+            while position < len(self.tokens) and self.tokens[position] == token:
+                if self.keys[position] == key:
+                    del self.tokens[position]
+                    del self.keys[position]
+                    break
+                position += 1
+
+    def lookup(self, text, limit):
+        """Suggestions dont les mots commencent par chacun des mots du texte"""
+        words = normalize_tokens(text)
+        if not words or len(max(words, key=len)) < AUTOCOMPLETE_MIN_LENGTH:
+            return []
+        # Les candidats viennent du mot le plus long (le plus sélectif)
+        first = max(words, key=len)
+        others = [word for word in words if word is not first]
+        candidates = set()
+        position = bisect_left(self.tokens, first)
+        while position < len(self.tokens) and self.tokens[position].startswith(first):
+            candidates.add(self.keys[position])
+            position += 1
+
+        matches = []
+        for key in candidates:
+            tokens, suggestion = self.entries[key]
+            if all(any(token.startswith(word) for token in tokens) for word in others):
+                matches.append((key, suggestion))
+        model_order = list(AUTOCOMPLETE_FIELDS)
+        matches.sort(key=lambda match: (model_order.index(match[0][0]), len(match[1]['name']), match[1]['name']))
+        return [suggestion for _key, suggestion in matches[:limit]]
+
+
+class Autocomplete(models.AbstractModel):
+    _name = 'sn.autocomplete'
+    _description = 'Autocomplétion de la recherche'
+
+    @api.model
+    def autocomplete(self, text, limit=10):
+        """
+        Suggestions pour la recherche en cours de frappe (3 caractères ou plus)
+
+        Servies par l'index en mémoire du worker, sans requête à la base
+        tant que la version de la hiérarchie n'a pas changé.
+        """
+        index = self._get_index()
+        with _indexes_lock:
+            return index.lookup(text, limit)
+
+    @api.model
+    def _get_index(self):
+        """
+        Index du worker, construit au premier accès et mis à jour à chaque
+        version de la hiérarchie
+
+        Les lectures en base se font hors du verrou, qui ne protège que
+        l'index en mémoire: les recherches des autres threads ne les
+        attendent pas.
+        """
+        dbname = self.env.cr.dbname
+        version = self.env['sn.hierarchy']._get_version()
+        with _indexes_lock:
+            index = _indexes.get(dbname)
+        if index is not None and index.version == version:
+            return index
+
+        changes = self._read_changes(index) if index is not None else None
+        with _indexes_lock:
+            current = _indexes.get(dbname)
+            if current is not None and current.version == version:
+                # Mis à jour entre-temps par un autre thread
+                return current
+            if changes is not None and current is index and self._apply_changes(index, version, changes):
+                return index
+
+        index = self._build_index(version)
+        with _indexes_lock:
+            _indexes[dbname] = index
+        return index
+
+    @api.model
+    def _invalidate_index(self):
+        with _indexes_lock:
+            _indexes.pop(self.env.cr.dbname, None)
+
+    @api.model
+    def _build_index(self, version):
+        synced_at = self.env.cr.now()
+        entries = []
+        for model_name in AUTOCOMPLETE_FIELDS:
+            for record in self._read_published(model_name, PUBLISHED_DOMAIN):
+                entries.append(self._prepare_entry(model_name, record))
+        return PrefixIndex.build(version, synced_at, entries)
+
+    @api.model
+    def _read_changes(self, index):
+        """
+        Enregistrements modifiés depuis la dernière synchronisation et nombres
+        d'enregistrements publiés: (date de synchronisation, {modèle:
+        enregistrements}, {modèle: nombre}), ou None si les modifications
+        sont trop nombreuses pour une mise à jour en place
+        """
+        synced_at = self.env.cr.now()
+        since = index.synced_at - AUTOCOMPLETE_SYNC_MARGIN
+        remaining = AUTOCOMPLETE_REBUILD_THRESHOLD
+        changed, counts = {}, {}
+        for model_name in AUTOCOMPLETE_FIELDS:
+            domain = [('write_date', '>=', since), ('active', 'in', [True, False])]
+            changed[model_name] = self._read_published(model_name, domain, limit=remaining + 1)
+            remaining -= len(changed[model_name])
+            if remaining < 0:
+                return None
+            counts[model_name] = self.env[model_name].sudo().search_count(PUBLISHED_DOMAIN)
+        return synced_at, changed, counts
+
+    @api.model
+    def _apply_changes(self, index, version, changes):
+        """
+        Reporter dans l'index les modifications lues par _read_changes (sous
+        le verrou)
+
+        Retourne False si l'index doit être reconstruit (suppressions).
+        """
+        synced_at, changed, counts = changes
+        for model_name, records in changed.items():
+            for record in records:
+                if record['active'] and record['state'] == 'active':
+                    index.add(*self._prepare_entry(model_name, record))
+                else:
+                    index.remove((model_name, record['id']))
+        # Une suppression ne laisse pas de trace: reconstruire si les nombres divergent
+        if any(index.count(model_name) != count for model_name, count in counts.items()):
+            return False
+        index.version = version
+        index.synced_at = synced_at
+        return True
+
+    @api.model
+    def _read_published(self, model_name, domain, limit=None):
+        fnames = AUTOCOMPLETE_FIELDS[model_name] + ['active', 'state']
+        return self.env[model_name].sudo().with_context(active_test=False).search_read(
+            domain, fnames, order='id', limit=limit,
+        )
+
+    @api.model
+    def _prepare_entry(self, model_name, record):
+        """(clé, mots, suggestion) d'un enregistrement lu par _read_published"""
+        tokens = set()
+        for fname in AUTOCOMPLETE_FIELDS[model_name]:
+            tokens.update(normalize_tokens(record[fname]))
+        suggestion = {
+            'type': model_name.split('.')[-1],
+            'id': record['id'],
+            'name': record['name'],
+            'url': SEARCH_URLS[model_name] % record['id'],
+        }
+        if record.get('function'):
+            suggestion['function'] = record['function']
+        return (model_name, record['id']), tuple(sorted(sys.intern(token) for token in tokens)), suggestion
@@ -0,0 +1,490 @@
+import base64
+import binascii
+import json
+import logging
+import re
+from collections import defaultdict
+
+import psycopg2
+
+from odoo import models, api, tools
+from odoo.tools import SQL, escape_psql
+from odoo.tools.sql import column_exists, create_index, drop_index, make_index_name
+
+_logger = logging.getLogger(__name__)
+
+
+# Configuration plein texte: français sans accents ("ministere" trouve
+# "Ministère"), ou français simple si l'extension unaccent est indisponible
+SEARCH_TS_CONFIG = 'sn_admin_french'
+SEARCH_TS_FALLBACK = 'french'
+
+SEARCH_VECTOR_COLUMN = 'search_vector'
+
+# Modes de recherche: plein texte (mots entiers ou préfixes, classés par
+# ts_rank) ou approchant (sous-chaînes et fautes de frappe, classés par
+# similarité des trigrammes sur les champs index='trigram')
+SEARCH_MODES = ('fulltext', 'fuzzy')
+
+# Recherche unifiée: modèles interrogés et pages publiques des résultats
+SEARCH_MODELS = ('sn.ministry', 'sn.category', 'sn.direction', 'sn.service', 'sn.agent')
+SEARCH_URLS = {
+    'sn.ministry': '/organigramme/ministere/%s',
+    'sn.category': '/organigramme/categorie/%s',
+    'sn.direction': '/organigramme/direction/%s',
+    'sn.service': '/organigramme/service/%s',
+    'sn.agent': '/organigramme/agent/%s',
+}
+
+# Préfixes des étapes du chemin hiérarchique (M12/C5/D40/S310/A9021/)
+HIERARCHY_PATH_MODELS = {
+    'M': 'sn.ministry',
+    'C': 'sn.category',
+    'D': 'sn.direction',
+    'S': 'sn.service',
+    'A': 'sn.agent',
+}
+
+
+class SearchMixin(models.AbstractModel):
+    _name = 'sn.search.mixin'
+    _description = 'Recherche plein texte et approchante'
+
+    # Champs indexés par poids ts_rank (A le plus fort), ex:
+    # {'A': ['name'], 'B': ['code']}
+    _search_vector_fields = {}
+
+    def init(self):
+        super().init()
+        if self._abstract:
+            return
+        Search = self.env['sn.search']
+        Search._init_trigram_indexes(self)
+        if self._search_vector_fields:
+            Search._init_search_vector(self)
+
+    def _get_search_result(self):
+        """Valeurs propres au modèle ajoutées à un résultat de la recherche unifiée"""
+        self.ensure_one()
+        return {}
+
+
+class Search(models.AbstractModel):
+    _name = 'sn.search'
+    _description = 'Recherche plein texte dans l\'administration'
+
+    @api.model
+    def _init_ts_config(self):
+        """
+        Créer la configuration française sans accents si possible
+
+        Retourne (configuration, créée lors de cet appel).
+        """
+        cr = self.env.cr
+        cr.execute("SELECT 1 FROM pg_ts_config WHERE cfgname = %s", [SEARCH_TS_CONFIG])
+        if cr.rowcount:
+            return SEARCH_TS_CONFIG, False
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+                cr.execute(SQL(
+                    "CREATE TEXT SEARCH CONFIGURATION %s (COPY = french)",
+                    SQL.identifier(SEARCH_TS_CONFIG),
+                ))
+                cr.execute(SQL(
+                    "ALTER TEXT SEARCH CONFIGURATION %s"
+                    " ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem",
+                    SQL.identifier(SEARCH_TS_CONFIG),
+                ))
+        except psycopg2.Error as e:
+            _logger.warning("Extension unaccent indisponible, recherche plein texte sans suppression des accents: %s", e)
+            return SEARCH_TS_FALLBACK, False
+        self.env.registry.clear_cache()
+        return SEARCH_TS_CONFIG, True
+
+    @api.model
+    @tools.ormcache()
+    def _get_ts_config(self):
+        """Configuration plein texte utilisée par les triggers et les requêtes"""
+        self.env.cr.execute("SELECT 1 FROM pg_ts_config WHERE cfgname = %s", [SEARCH_TS_CONFIG])
+        return SEARCH_TS_CONFIG if self.env.cr.rowcount else SEARCH_TS_FALLBACK
+
+    @api.model
+    def _init_trigram_indexes(self, model):
+        """
+        Préparer les index trigrammes des champs index='trigram'
+
+        L'extension pg_trgm est créée si besoin (les index eux-mêmes sont
+        créés par l'ORM après l'initialisation des modèles), et les anciens
+        index B-tree de même nom sont supprimés pour être remplacés.
+        """
+        cr = self.env.cr
+        fnames = [fname for fname, field in model._fields.items() if field.index == 'trigram' and field.store]
+        if not fnames:
+            return
+        if not self.env.registry.has_trigram:
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except psycopg2.Error as e:
+                _logger.warning("Extension pg_trgm indisponible, pas d'index trigrammes: %s", e)
+                return
+            self.env.registry.has_trigram = True
+
+        indexnames = {make_index_name(model._table, fname): fname for fname in fnames}
+        cr.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = %s AND indexname IN %s AND indexdef NOT ILIKE %s",
+            [model._table, tuple(indexnames), '%gin_trgm_ops%'],
+        )
+        for indexname, in cr.fetchall():
+            drop_index(cr, indexname, model._table)
+
+    @api.model
+    def _init_search_vector(self, model):
+        """
+        Colonne tsvector d'un modèle, entretenue par un trigger, et son index GIN
+
+        La colonne n'est pas un champ de l'ORM: PostgreSQL la calcule à
+        chaque insertion ou modification des champs indexés.
+        """
+        cr = self.env.cr
+        config, created = self._init_ts_config()
+        table = model._table
+        function = f'{table}_search_vector_update'
+
+        added = not column_exists(cr, table, SEARCH_VECTOR_COLUMN)
+        if added:
+            cr.execute(SQL(
+                "ALTER TABLE %s ADD COLUMN %s tsvector",
+                SQL.identifier(table), SQL.identifier(SEARCH_VECTOR_COLUMN),
+            ))
+
+        vector = SQL(" || ").join(
+            SQL(
+                "setweight(to_tsvector(%s::regconfig, coalesce(NEW.%s, '')), %s)",
+                config, SQL.identifier(fname), weight,
+            )
+            for weight, fnames in sorted(model._search_vector_fields.items())
+            for fname in fnames
+        )
+        columns = SQL(", ").join(
+            SQL.identifier(fname)
+            for fnames in model._search_vector_fields.values()
+            for fname in fnames
+        )
+        cr.execute(SQL(
+            """
+            CREATE OR REPLACE FUNCTION %(function)s() RETURNS trigger AS $$
+            BEGIN
+                NEW.%(column)s := %(vector)s;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS %(trigger)s ON %(table)s;
+            CREATE TRIGGER %(trigger)s
+                BEFORE INSERT OR UPDATE OF %(columns)s ON %(table)s
+                FOR EACH ROW EXECUTE FUNCTION %(function)s();
+            """,
+            function=SQL.identifier(function),
+            column=SQL.identifier(SEARCH_VECTOR_COLUMN),
+            vector=vector,
+            trigger=SQL.identifier(f'{table}_search_vector_trigger'),
+            table=SQL.identifier(table),
+            columns=columns,
+        ))
+
+        # Remplissage initial, ou après changement de configuration
+        if added or created:
+            fname = next(iter(model._search_vector_fields.values()))[0]
+            cr.execute(SQL("UPDATE %s SET %s = %s", SQL.identifier(table), SQL.identifier(fname), SQL.identifier(fname)))
+
+        create_index(
+            cr,
+            f'{table}_{SEARCH_VECTOR_COLUMN}_index',
+            table,
+            [SEARCH_VECTOR_COLUMN],
+            method='gin',
+        )
+
+    @api.model
+    def _get_tsquery(self, text):
+        """
+        Requête plein texte: tous les mots, chacun pouvant être un préfixe
+        (recherche en cours de frappe). None si le texte n'a aucun mot.
+        """
+        words = re.findall(r'[^\W_]+', text or '')
+        if not words:
+            return None
+        return SQL(
+            "to_tsquery(%s::regconfig, %s)",
+            self._get_ts_config(),
+            ' & '.join(f'{word}:*' for word in words),
+        )
+
+    @api.model
+    def _get_fulltext_condition(self, model, alias, text):
+        """(condition, pertinence) de la recherche plein texte, None si le texte n'a aucun mot"""
+        tsquery = self._get_tsquery(text)
+        if tsquery is None:
+            return None
+        vector = SQL.identifier(alias, SEARCH_VECTOR_COLUMN)
+        return SQL("%s @@ %s", vector, tsquery), SQL("ts_rank(%s, %s)", vector, tsquery)
+
+    @api.model
+    def _get_fuzzy_condition(self, model, alias, text):
+        """
+        (condition, pertinence) de la recherche approchante sur les champs
+        index='trigram': sous-chaîne (ILIKE) ou mot proche (<%), classés par
+        word_similarity; les deux opérateurs utilisent les index GIN
+        """
+        text = (text or '').strip()
+        fnames = [fname for fname, field in model._fields.items() if field.index == 'trigram' and field.store]
+        if not text or not fnames:
+            return None
+        columns = [SQL.identifier(alias, fname) for fname in fnames]
+        pattern = f'%{escape_psql(text)}%'
+        conditions = [SQL("%s ILIKE %s", column, pattern) for column in columns]
+        if not self.env.registry.has_trigram:
+            return SQL("(%s)", SQL(" OR ").join(conditions)), SQL("0")
+        # Opérateur en fragment sans paramètre: SQL() ne conserve le %%
+        # (échappé pour psycopg2) que dans un code non formaté
+        word_similar = SQL("<%%")
+        conditions += [SQL("%s %s %s", text, word_similar, column) for column in columns]
+        rank = SQL("GREATEST(%s)", SQL(", ").join(SQL("word_similarity(%s, %s)", text, column) for column in columns))
+        return SQL("(%s)", SQL(" OR ").join(conditions)), rank
+
+    @api.model
+    def _get_ranked_query(self, model_name, text, domain=None, offset=0, limit=None, mode='fulltext'):
+        """
+        Query du domaine restreinte au texte, triée par pertinence, et
+        l'expression de la pertinence; (None, None) si le texte est vide
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Mode de recherche inconnu: {mode}")
+        Model = self.env[model_name]
+        query = Model._search(domain or [], offset=offset, limit=limit)
+        get_condition = self._get_fuzzy_condition if mode == 'fuzzy' else self._get_fulltext_condition
+        condition = get_condition(Model, query.table, text)
+        if condition is None:
+            return None, None
+        where, rank = condition
+        # Pertinence en float8: ts_rank et word_similarity sont des real, qui
+        # ne seraient jamais égaux à la clé relue d'un curseur (float8)
+        rank = SQL("(%s)::float8", rank)
+        query.add_where(where)
+        query.order = SQL("%s DESC, %s", rank, SQL.identifier(query.table, 'id'))
+        return query, rank
+
+    @api.model
+    def ranked_search(self, model_name, text, domain=None, offset=0, limit=None, mode='fulltext'):
+        """Enregistrements du domaine correspondant au texte, les plus pertinents en premier"""
+        query, _rank = self._get_ranked_query(model_name, text, domain, offset, limit, mode)
+        if query is None:
+            return self.env[model_name]
+        return self.env[model_name].browse(query.get_result_ids())
+
+    @api.model
+    def get_search_mode(self, model_name, text, domain=None, mode=None):
+        """
+        Mode à utiliser pour un texte: celui demandé, sinon plein texte, ou
+        approchant si le plein texte ne trouve rien (fautes de frappe,
+        fragments de matricule ou d'email)
+        """
+        if mode in SEARCH_MODES:
+            return mode
+        query, _rank = self._get_ranked_query(model_name, text, domain, limit=1)
+        if query is not None and query.get_result_ids():
+            return 'fulltext'
+        return 'fuzzy'
+
+    @api.model
+    def ranked_count(self, model_name, text, domain=None, mode='fulltext'):
+        """Nombre d'enregistrements du domaine correspondant au texte"""
+        query, _rank = self._get_ranked_query(model_name, text, domain, mode=mode)
+        if query is None:
+            return 0
+        query.order = None
+        [(count,)] = self.env.execute_query(query.select(SQL("COUNT(*)")))
+        return count
+
+    @api.model
+    def search_all(self, text, domain=None, limit=20, mode=None, model_names=SEARCH_MODELS):
+        """
+        Recherche unifiée dans les ministères, catégories, directions,
+        services et agents
+
+        Une seule requête: UNION ALL des recherches classées de chaque
+        modèle, chacune limitée et servie par ses index. Sans mode imposé,
+        la recherche approchante n'est lancée que si le plein texte ne
+        trouve rien. Retourne les résultats typés, triés par pertinence,
+        avec leur fil d'Ariane.
+        """
+        rows = []
+        for search_mode in [mode] if mode in SEARCH_MODES else SEARCH_MODES:
+            rows = self._search_all_rows(text, domain, limit, search_mode, model_names)
+            if rows:
+                break
+        return self._prepare_search_results(rows)
+
+    @api.model
+    def _search_all_rows(self, text, domain, limit, mode, model_names):
+        """[(modèle, id, pertinence, chemin hiérarchique)] des meilleurs résultats"""
+        selects = []
+        for model_name in model_names:
+            query, rank = self._get_ranked_query(model_name, text, domain, limit=limit, mode=mode)
+            if query is None or query.is_empty():
+                continue
+            selects.append(SQL("(%s)", query.select(
+                SQL("%s AS model", model_name),
+                SQL("%s AS id", SQL.identifier(query.table, 'id')),
+                SQL("%s AS rank", rank),
+                SQL("%s AS path", SQL.identifier(query.table, 'hierarchy_path')),
+            )))
+        if not selects:
+            return []
+        return self.env.execute_query(SQL(
+            "SELECT model, id, rank, path FROM (%s) AS results ORDER BY rank DESC, model, id LIMIT %s",
+            SQL(" UNION ALL ").join(selects),
+            limit,
+        ))
+
+    @api.model
+    def _prepare_search_results(self, rows):
+        """
+        Résultats de la recherche unifiée
+
+        Le fil d'Ariane est lu dans le chemin hiérarchique de chaque
+        résultat; les noms de tous les ancêtres sont résolus en une requête.
+        """
+        steps = {
+            (model_name, res_id): [
+                (HIERARCHY_PATH_MODELS[prefix], int(step_id))
+                for prefix, step_id in re.findall(r'([A-Z])(\d+)/', path or '')
+            ][:-1]
+            for model_name, res_id, _rank, path in rows
+        }
+        ancestors = defaultdict(set)
+        for path_steps in steps.values():
+            for model_name, res_id in path_steps:
+                ancestors[model_name].add(res_id)
+        names = self._get_names(ancestors)
+
+        ids_by_model = defaultdict(list)
+        for model_name, res_id, _rank, _path in rows:
+            ids_by_model[model_name].append(res_id)
+        records = {model_name: self.env[model_name].browse(ids) for model_name, ids in ids_by_model.items()}
+
+        results = []
+        for model_name, res_id, rank, _path in rows:
+            record = records[model_name].browse(res_id).with_prefetch(records[model_name]._prefetch_ids)
+            breadcrumb = [
+                {
+                    'type': step_model.split('.')[-1],
+                    'id': step_id,
+                    'name': names.get((step_model, step_id)),
+                    'url': SEARCH_URLS[step_model] % step_id,
+                }
+                for step_model, step_id in steps[model_name, res_id]
+            ]
+            result = {step['type']: step['name'] for step in breadcrumb}
+            result.update(record._get_search_result())
+            result.update({
+                'type': model_name.split('.')[-1],
+                'model': model_name,
+                'id': res_id,
+                'name': record.name,
+                'rank': rank,
+                'url': SEARCH_URLS[model_name] % res_id,
+                'breadcrumb': breadcrumb,
+            })
+            results.append(result)
+        return results
+
+    @api.model
+    def _get_names(self, ids_by_model):
+        """Noms de structures de plusieurs modèles en une requête: {(modèle, id): nom}"""
+        selects = [
+            SQL(
+                "SELECT %s AS model, id, name FROM %s WHERE id IN %s",
+                model_name, SQL.identifier(self.env[model_name]._table), tuple(ids),
+            )
+            for model_name, ids in ids_by_model.items()
+            if ids
+        ]
+        if not selects:
+            return {}
+        rows = self.env.execute_query(SQL(" UNION ALL ").join(selects))
+        return {(model_name, res_id): name for model_name, res_id, name in rows}
+
+    # ------------------------------------------------------------------
+    # Pagination par clé
+    # ------------------------------------------------------------------
+
+    @api.model
+    def keyset_search(self, model_name, text=None, domain=None, cursor=None, limit=20, mode=None):
+        """
+        Page de résultats après un curseur opaque: (enregistrements, curseur
+        de la page suivante ou None)
+
+        Sans texte, les enregistrements sont triés par (name, id); avec un
+        texte, par (pertinence, id). La page reprend après la dernière clé
+        de la précédente, de sorte que la page N coûte autant que la
+        première. Le mode de recherche est fixé par la première page et
+        conservé dans le curseur.
+        """
+        Model = self.env[model_name]
+        position = self._decode_cursor(cursor)
+        if position and (position[0] == 'name') == bool(text):
+            # Curseur d'une autre recherche: reprendre à la première page
+            position = None
+        if position:
+            mode = position[0]
+        elif text:
+            mode = self.get_search_mode(model_name, text, domain, mode)
+        else:
+            mode = 'name'
+
+        if mode == 'name':
+            query = Model._search(domain or [], limit=limit + 1, order='name, id')
+            key = SQL.identifier(query.table, 'name')
+            if position:
+                query.add_where(SQL("(%s, %s) > (%s, %s)", key, SQL.identifier(query.table, 'id'), *position[1:]))
+        else:
+            query, key = self._get_ranked_query(model_name, text, domain, limit=limit + 1, mode=mode)
+            if query is None:
+                return Model, None
+            if position:
+                rank, res_id = position[1:]
+                query.add_where(SQL(
+                    "(%s < %s::float8 OR (%s = %s::float8 AND %s > %s))",
+                    key, rank, key, rank, SQL.identifier(query.table, 'id'), res_id,
+                ))
+        rows = self.env.execute_query(query.select(SQL.identifier(query.table, 'id'), key))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            res_id, value = rows[-1]
+            next_cursor = self._encode_cursor([mode, value, res_id])
+        return Model.browse([res_id for res_id, _value in rows]), next_cursor
+
+    @api.model
+    def _encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+    @api.model
+    def _decode_cursor(self, cursor):
+        """[mode, clé, id] d'un curseur, None s'il est absent ou invalide (première page)"""
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except (binascii.Error, ValueError):
+            return None
+        if not (isinstance(position, list) and len(position) == 3
+                and position[0] in ('name',) + SEARCH_MODES and isinstance(position[2], int)):
+            return None
+        if not isinstance(position[1], str if position[0] == 'name' else (int, float)):
+            return None
+        return position
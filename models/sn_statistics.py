@@ -0,0 +1,181 @@
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+
+class Statistics(models.Model):
+    _name = 'sn.statistics'
+    _description = 'Statistiques de l\'administration sénégalaise'
+    _auto = False
+    _order = 'level, ministry_id, category_id, direction_id'
+
+    level = fields.Selection(
+        selection=[
+            ('ministry', 'Ministère'),
+            ('direction', 'Direction'),
+            ('service', 'Service'),
+            ('agent', 'Agent'),
+        ],
+        string='Niveau',
+        readonly=True,
+    )
+    ministry_id = fields.Many2one('sn.ministry', string='Ministère', readonly=True)
+    ministry_type = fields.Selection(
+        selection=[
+            ('presidency', 'Présidence'),
+            ('primature', 'Primature'),
+            ('ministry', 'Ministère'),
+        ],
+        string='Type d\'institution',
+        readonly=True,
+    )
+    category_id = fields.Many2one('sn.category', string='Catégorie', readonly=True)
+    direction_id = fields.Many2one('sn.direction', string='Direction', readonly=True)
+    structure_type = fields.Selection(
+        selection=[
+            ('presidency', 'Présidence'),
+            ('primature', 'Primature'),
+            ('ministry', 'Ministère'),
+            ('generale', 'Direction Générale'),
+            ('regionale', 'Direction Régionale'),
+            ('departementale', 'Direction Départementale'),
+            ('technique', 'Direction Technique'),
+            ('service', 'Service'),
+            ('bureau', 'Bureau'),
+            ('cellule', 'Cellule'),
+            ('division', 'Division'),
+        ],
+        string='Type de structure',
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=[
+            ('draft', 'Brouillon'),
+            ('active', 'Actif'),
+            ('archived', 'Archivé'),
+        ],
+        string='État',
+        readonly=True,
+    )
+    record_count = fields.Integer(string='Nombre', readonly=True)
+    interim_count = fields.Integer(string='Intérims', readonly=True)
+    hr_linked_count = fields.Integer(string='Liés à un employé RH', readonly=True)
+
+    def init(self):
+        """
+        Vue matérialisée des agrégats par niveau, ministère, catégorie,
+        direction, type et état (enregistrements actifs uniquement)
+
+        L'index unique sur id permet le rafraîchissement concurrent.
+        """
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL(
+            """
+            CREATE MATERIALIZED VIEW %(table)s AS (
+                SELECT ROW_NUMBER() OVER (
+                           ORDER BY level, ministry_id, category_id, direction_id, structure_type, state
+                       ) AS id,
+                       stats.*
+                  FROM (
+                    SELECT 'ministry' AS level, m.id AS ministry_id, m.type AS ministry_type,
+                           NULL::integer AS category_id, NULL::integer AS direction_id,
+                           m.type AS structure_type, m.state,
+                           1 AS record_count, 0 AS interim_count, 0 AS hr_linked_count
+                      FROM sn_ministry m
+                     WHERE m.active
+                    UNION ALL
+                    SELECT 'direction', d.ministry_id, m.type, d.category_id, NULL,
+                           d.type, d.state, COUNT(*), 0, 0
+                      FROM sn_direction d
+                      JOIN sn_ministry m ON m.id = d.ministry_id
+                     WHERE d.active
+                  GROUP BY d.ministry_id, m.type, d.category_id, d.type, d.state
+                    UNION ALL
+                    SELECT 'service', s.ministry_id, m.type, s.category_id, s.direction_id,
+                           s.type, s.state, COUNT(*), 0, 0
+                      FROM sn_service s
+                 LEFT JOIN sn_ministry m ON m.id = s.ministry_id
+                     WHERE s.active
+                  GROUP BY s.ministry_id, m.type, s.category_id, s.direction_id, s.type, s.state
+                    UNION ALL
+                    SELECT 'agent', a.ministry_id, m.type, s.category_id, a.direction_id,
+                           NULL, a.state, COUNT(*),
+                           COUNT(*) FILTER (WHERE a.is_interim),
+                           COUNT(a.employee_id)
+                      FROM sn_agent a
+                      JOIN sn_service s ON s.id = a.service_id
+                 LEFT JOIN sn_ministry m ON m.id = a.ministry_id
+                     WHERE a.active
+                  GROUP BY a.ministry_id, m.type, s.category_id, a.direction_id, a.state
+                  ) AS stats
+            )
+            """,
+            table=SQL.identifier(self._table),
+        ))
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX %s ON %s (id)",
+            SQL.identifier(f'{self._table}_id_index'),
+            SQL.identifier(self._table),
+        ))
+
+    @api.model
+    def _refresh(self):
+        """Rafraîchir la vue matérialisée sans bloquer les lectures (cron)"""
+        self.env.flush_all()
+        self.env.cr.execute(SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY %s", SQL.identifier(self._table)))
+        self.invalidate_model()
+
+    @api.model
+    def get_statistics(self):
+        """
+        Statistiques des structures à l'état actif, lues depuis la vue
+
+        Retourne les totaux par niveau, le nombre d'institutions par type et
+        la répartition par ministère (triée par nombre d'agents), avec les
+        taux d'intérim et de liaison RH.
+        """
+        Statistics = self.sudo()
+        aggregates = ['record_count:sum', 'interim_count:sum', 'hr_linked_count:sum']
+
+        totals = {level: 0 for level in ('ministry', 'direction', 'service', 'agent')}
+        interim = hr_linked = 0
+        for level, count, level_interim, level_hr_linked in Statistics._read_group(
+            [('state', '=', 'active')], ['level'], aggregates,
+        ):
+            totals[level] = count
+            if level == 'agent':
+                interim, hr_linked = level_interim, level_hr_linked
+
+        by_type = dict(Statistics._read_group(
+            [('state', '=', 'active'), ('level', '=', 'ministry')], ['ministry_type'], ['record_count:sum'],
+        ))
+
+        ministries = {}
+        for ministry, in Statistics._read_group(
+            [('state', '=', 'active'), ('level', '=', 'ministry')], ['ministry_id'],
+        ):
+            ministries[ministry] = {
+                'ministry': ministry,
+                'direction': 0,
+                'service': 0,
+                'agent': 0,
+                'interim_ratio': 0.0,
+                'hr_linked_ratio': 0.0,
+            }
+        for ministry, level, count, level_interim, level_hr_linked in Statistics._read_group(
+            [('state', '=', 'active'), ('level', '!=', 'ministry'), ('ministry_id', 'in', [m.id for m in ministries])],
+            ['ministry_id', 'level'],
+            aggregates,
+        ):
+            values = ministries[ministry]
+            values[level] = count
+            if level == 'agent' and count:
+                values['interim_ratio'] = level_interim / count
+                values['hr_linked_ratio'] = level_hr_linked / count
+
+        return {
+            'totals': totals,
+            'interim_ratio': interim / totals['agent'] if totals['agent'] else 0.0,
+            'hr_linked_ratio': hr_linked / totals['agent'] if totals['agent'] else 0.0,
+            'by_type': by_type,
+            'ministries': sorted(ministries.values(), key=lambda values: (-values['agent'], values['ministry'].name)),
+        }
@@ -0,0 +1,168 @@
+from collections import defaultdict
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+
+# Clé d'une série: une structure (niveau, ministère, direction, type)
+SNAPSHOT_KEY = ('level', 'ministry_id', 'direction_id', 'structure_type')
+SNAPSHOT_VALUES = ('record_count', 'active_count', 'interim_count', 'hr_linked_count')
+
+SERIES_INTERVALS = {
+    'day': '1 day',
+    'week': '1 week',
+    'month': '1 month',
+}
+
+
+class StatisticsSnapshot(models.Model):
+    _name = 'sn.statistics.snapshot'
+    _description = 'Historique des statistiques de l\'administration'
+    _order = 'date_from desc, level, ministry_id, direction_id'
+
+    # Encodage par plages: une ligne couvre tous les jours consécutifs
+    # [date_from, date_to] pendant lesquels les valeurs n'ont pas changé
+    date_from = fields.Date(string='Du', required=True, readonly=True)
+    date_to = fields.Date(string='Au', required=True, readonly=True)
+    level = fields.Selection(
+        selection=[
+            ('ministry', 'Ministère'),
+            ('direction', 'Direction'),
+            ('service', 'Service'),
+            ('agent', 'Agent'),
+        ],
+        string='Niveau',
+        required=True,
+        readonly=True,
+    )
+    ministry_id = fields.Many2one('sn.ministry', string='Ministère', readonly=True, ondelete='set null')
+    direction_id = fields.Many2one('sn.direction', string='Direction', readonly=True, ondelete='set null')
+    structure_type = fields.Char(string='Type de structure', readonly=True)
+    record_count = fields.Integer(string='Nombre', readonly=True)
+    active_count = fields.Integer(string='Actifs', readonly=True)
+    interim_count = fields.Integer(string='Intérims', readonly=True)
+    hr_linked_count = fields.Integer(string='Liés à un employé RH', readonly=True)
+
+    def init(self):
+        super().init()
+        # Requêtes de séries: niveau et ministère fixés, plage de dates
+        create_index(
+            self.env.cr,
+            'sn_statistics_snapshot_range_index',
+            self._table,
+            ['level', 'ministry_id', 'date_to', 'date_from'],
+        )
+
+    def _snapshot_key(self):
+        return (self.level, self.ministry_id.id, self.direction_id.id, self.structure_type or False)
+
+    @api.model
+    def _take_snapshot(self, date=None):
+        """
+        Instantané quotidien des statistiques (cron de nuit)
+
+        Une série inchangée depuis le dernier instantané voit simplement sa
+        plage prolongée; seules les séries modifiées, nouvelles ou disparues
+        produisent de nouvelles lignes. Relancer le même jour remplace les
+        valeurs du jour.
+        """
+        date = date or fields.Date.context_today(self)
+        yesterday = date - relativedelta(days=1)
+
+        Statistics = self.env['sn.statistics'].sudo()
+        Statistics._refresh()
+        current = defaultdict(lambda: dict.fromkeys(SNAPSHOT_VALUES, 0))
+        for level, ministry, direction, structure_type, state, count, interim, hr_linked in Statistics._read_group(
+            [],
+            list(SNAPSHOT_KEY) + ['state'],
+            ['record_count:sum', 'interim_count:sum', 'hr_linked_count:sum'],
+        ):
+            values = current[level, ministry.id, direction.id, structure_type or False]
+            values['record_count'] += count
+            values['active_count'] += count if state == 'active' else 0
+            values['interim_count'] += interim
+            values['hr_linked_count'] += hr_linked
+
+        Snapshot = self.sudo()
+        # Par ordre croissant: pour chaque série, la ligne du jour (si le
+        # cron a déjà tourné) remplace celle close la veille
+        open_rows = {
+            row._snapshot_key(): row
+            for row in Snapshot.search([('date_to', '>=', yesterday)], order='date_from asc, id asc')
+        }
+
+        extend_ids, close_ids, stale = [], [], Snapshot
+        vals_list = []
+        for key, values in current.items():
+            row = open_rows.pop(key, None)
+            if row and all(row[fname] == value for fname, value in values.items()):
+                if row.date_to < date:
+                    extend_ids.append(row.id)
+                continue
+            if row and row.date_from == date:
+                row.write(values)
+                continue
+            if row and row.date_to == date:
+                close_ids.append(row.id)
+            vals_list.append(dict(values, **dict(zip(SNAPSHOT_KEY, key)), date_from=date, date_to=date))
+
+        # Séries disparues depuis le dernier instantané
+        for row in open_rows.values():
+            if row.date_from == date:
+                stale |= row
+            elif row.date_to == date:
+                close_ids.append(row.id)
+
+        Snapshot.browse(extend_ids).write({'date_to': date})
+        Snapshot.browse(close_ids).write({'date_to': yesterday})
+        stale.unlink()
+        return Snapshot.create(vals_list)
+
+    @api.model
+    def get_series(self, date_from, date_to, level='agent', ministry_id=None, interval='day', value='record_count'):
+        """
+        Série temporelle d'une valeur, additionnée sur toutes les structures
+        du niveau (ou d'un ministère)
+
+        Retourne [(date, valeur)] pour chaque pas de l'intervalle; une date
+        sans instantané vaut None.
+        """
+        if value not in SNAPSHOT_VALUES:
+            raise ValueError(f"Valeur inconnue: {value}")
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            SELECT day::date, SUM(s.%(value)s)
+              FROM generate_series(%(date_from)s::date, %(date_to)s::date, %(interval)s::interval) AS day
+         LEFT JOIN %(table)s s
+                ON s.date_from <= day AND s.date_to >= day
+               AND s.level = %(level)s %(ministry)s
+          GROUP BY day
+          ORDER BY day
+            """,
+            value=SQL.identifier(value),
+            date_from=date_from,
+            date_to=date_to,
+            interval=SERIES_INTERVALS[interval],
+            table=SQL.identifier(self._table),
+            level=level,
+            ministry=SQL("AND s.ministry_id = %s", ministry_id) if ministry_id else SQL(),
+        ))
+        return self.env.cr.fetchall()
+
+    @api.model
+    def get_year_over_year(self, date=None, level='agent', ministry_id=None, value='record_count'):
+        """Valeur à une date et à la même date un an plus tôt"""
+        date = fields.Date.to_date(date) or fields.Date.context_today(self)
+        previous = date - relativedelta(years=1)
+        [(_day, current)] = self.get_series(date, date, level, ministry_id, value=value)
+        [(_day, last_year)] = self.get_series(previous, previous, level, ministry_id, value=value)
+        return {
+            'date': date,
+            'value': current,
+            'previous_date': previous,
+            'previous_value': last_year,
+        }
@@ -4,6 +4,15 @@ odoo.define('sn_admin.public', function (require) {
 var publicWidget = require('web.public.widget');
 var ajax = require('web.ajax');
 
+// Libellés des types de résultats de la recherche unifiée
+var TYPE_LABELS = {
+    ministry: 'Ministère',
+    category: 'Catégorie',
+    direction: 'Direction',
+    service: 'Service',
+    agent: 'Agent',
+};
+
 /**
  * Widget pour la recherche AJAX en temps réel
  */
@@ -46,12 +55,21 @@ publicWidget.registry.SNAdminSearch = publicWidget.Widget.extend({
 
     /**
      * Effectuer la recherche AJAX
+     * Les suggestions viennent de l'index en mémoire du serveur; la
+     * recherche complète (approchante) n'est lancée que s'il n'y en a pas
      */
     _performSearch: function (query) {
         var self = this;
 
-        ajax.jsonRpc('/organigramme/api/search', 'call', {
+        ajax.jsonRpc('/organigramme/api/autocomplete', 'call', {
             q: query
+        }).then(function (data) {
+            if (data.results.length) {
+                return data;
+            }
+            return ajax.jsonRpc('/organigramme/api/search', 'call', {
+                q: query
+            });
         }).then(function (data) {
             self._displayResults(data.results);
         }).catch(function (error) {
@@ -76,10 +94,20 @@ publicWidget.registry.SNAdminSearch = publicWidget.Widget.extend({
             $resultsContainer.append('<div class="list-group-item">Aucun résultat trouvé</div>');
         } else {
             results.forEach(function (result) {
-                var $item = $('<a class="list-group-item list-group-item-action" href="/organigramme/agent/' + result.id + '"></a>');
-                $item.append('<h6 class="mb-1">' + result.name + '</h6>');
-                $item.append('<p class="mb-1 small">' + result.function + '</p>');
-                $item.append('<small class="text-muted">' + result.service + ' - ' + result.ministry + '</small>');
+                // Ministères, catégories, directions, services et agents, avec leur fil d'Ariane
+                var $item = $('<a class="list-group-item list-group-item-action"></a>').attr('href', result.url);
+                var $title = $('<h6 class="mb-1"></h6>').text(result.name);
+                $title.prepend($('<span class="badge bg-secondary me-2"></span>').text(TYPE_LABELS[result.type] || result.type));
+                $item.append($title);
+                if (result.function) {
+                    $item.append($('<p class="mb-1 small"></p>').text(result.function));
+                }
+                var breadcrumb = (result.breadcrumb || []).map(function (step) {
+                    return step.name;
+                });
+                if (breadcrumb.length) {
+                    $item.append($('<small class="text-muted"></small>').text(breadcrumb.join(' › ')));
+                }
                 $resultsContainer.append($item);
             });
         }
@@ -103,67 +131,116 @@ publicWidget.registry.SNAdminFilters = publicWidget.Widget.extend({
     events: {
         'change select[name="ministry_id"]': '_onMinistryChange',
         'change select[name="direction_id"]': '_onDirectionChange',
+        'focus select[name="direction_id"]': '_onDirectionFocus',
+        'focus select[name="service_id"]': '_onServiceFocus',
     },
 
     /**
-     * Gestionnaire de changement de ministère
-     * Filtre les directions selon le ministère sélectionné
+     * @override
      */
-    _onMinistryChange: function (ev) {
-        var ministryId = $(ev.currentTarget).val();
-        var $directionSelect = this.$('select[name="direction_id"]');
-        var $serviceSelect = this.$('select[name="service_id"]');
+    start: function () {
+        this._super.apply(this, arguments);
+        // Listes déjà chargées, par URL (servies en JSON, en cache côté serveur)
+        this.optionsCache = {};
+        this.loadedSelects = {};
+    },
 
-        if (!ministryId) {
-            $directionSelect.find('option').show();
-            $serviceSelect.find('option').show();
-            return;
+    /**
+     * Charger les options d'une liste et les insérer dans le select
+     * La valeur sélectionnée est conservée si elle figure dans la liste
+     */
+    _loadOptions: function ($select, url) {
+        var self = this;
+        var name = $select.attr('name');
+        if (this.loadedSelects[name] === url) {
+            return Promise.resolve();
         }
-
-        // Filtrer les directions
-        $directionSelect.find('option').each(function () {
-            var $option = $(this);
-            var optionMinistryId = $option.data('ministry-id');
-            
-            if (!optionMinistryId || optionMinistryId == ministryId) {
-                $option.show();
-            } else {
-                $option.hide();
-            }
+        this.loadedSelects[name] = url;
+        var options = this.optionsCache[url];
+        if (!options) {
+            options = this.optionsCache[url] = fetch(url, { credentials: 'same-origin' }).then(function (res) {
+                if (!res.ok) {
+                    throw new Error('HTTP ' + res.status);
+                }
+                return res.json();
+            });
+        }
+        return options.then(function (records) {
+            var value = $select.val();
+            $select.find('option[value!=""]').remove();
+            records.forEach(function (record) {
+                $select.append($('<option></option>').attr('value', record.id).text(record.name));
+            });
+            $select.val(value || '');
+            $select.prop('disabled', false);
+        }).catch(function (error) {
+            delete self.optionsCache[url];
+            delete self.loadedSelects[name];
+            console.error('Filter options error:', error);
         });
+    },
+
+    _resetSelect: function ($select) {
+        delete this.loadedSelects[$select.attr('name')];
+        $select.find('option[value!=""]').remove();
+        $select.val('');
+        $select.prop('disabled', true);
+    },
 
-        // Reset direction et service
-        $directionSelect.val('');
-        $serviceSelect.val('');
+    _directionsUrl: function () {
+        var ministryId = this.$('select[name="ministry_id"]').val();
+        return ministryId ? '/organigramme/api/filters/directions?ministry_id=' + encodeURIComponent(ministryId) : null;
+    },
+
+    _servicesUrl: function () {
+        var directionId = this.$('select[name="direction_id"]').val();
+        return directionId ? '/organigramme/api/filters/services?direction_id=' + encodeURIComponent(directionId) : null;
+    },
+
+    /**
+     * Gestionnaire de changement de ministère
+     * Charge les directions du ministère sélectionné
+     */
+    _onMinistryChange: function () {
+        var $directionSelect = this.$('select[name="direction_id"]');
+        this._resetSelect($directionSelect);
+        this._resetSelect(this.$('select[name="service_id"]'));
+
+        var url = this._directionsUrl();
+        if (url) {
+            this._loadOptions($directionSelect, url);
+        }
     },
 
     /**
      * Gestionnaire de changement de direction
-     * Filtre les services selon la direction sélectionnée
+     * Charge les services de la direction sélectionnée
      */
-    _onDirectionChange: function (ev) {
-        var directionId = $(ev.currentTarget).val();
+    _onDirectionChange: function () {
         var $serviceSelect = this.$('select[name="service_id"]');
+        this._resetSelect($serviceSelect);
 
-        if (!directionId) {
-            $serviceSelect.find('option').show();
-            return;
+        var url = this._servicesUrl();
+        if (url) {
+            this._loadOptions($serviceSelect, url);
         }
+    },
 
-        // Filtrer les services
-        $serviceSelect.find('option').each(function () {
-            var $option = $(this);
-            var optionDirectionId = $option.data('direction-id');
-            
-            if (!optionDirectionId || optionDirectionId == directionId) {
-                $option.show();
-            } else {
-                $option.hide();
-            }
-        });
+    /**
+     * Compléter à la demande une liste rendue avec sa seule valeur sélectionnée
+     */
+    _onDirectionFocus: function () {
+        var url = this._directionsUrl();
+        if (url) {
+            this._loadOptions(this.$('select[name="direction_id"]'), url);
+        }
+    },
 
-        // Reset service
-        $serviceSelect.val('');
+    _onServiceFocus: function () {
+        var url = this._servicesUrl();
+        if (url) {
+            this._loadOptions(this.$('select[name="service_id"]'), url);
+        }
     },
 });
 
@@ -327,7 +404,7 @@ function loadOrgChart(ministryId) {
         data: JSON.stringify({
             jsonrpc: '2.0',
             method: 'call',
-            params: {ministry_id: ministryId}
+            params: {ministry_id: ministryId, depth: 2}
         }),
         success: function(response) {
             if (response.result) {
@@ -359,14 +436,28 @@ function renderOrgChart(data) {
     container.empty();
     
     // Initialiser OrgChart.js
-    container.orgchart({
+    var oc = container.orgchart({
         data: data,
         nodeContent: 'title',
         pan: true,
         zoom: true,
         depth: 3,
         exportButton: true,
-        exportFilename: 'organigramme_senegal'
+        exportFilename: 'organigramme_senegal',
+        createNode: function ($node, node) {
+            $node.attr('data-node-id', node.id).attr('data-node-type', node.model || '');
+            // Sous-structures non chargées: bouton pour déplier à la demande
+            var loaded = (node.children || []).length;
+            if (node.model && !loaded && node.children_count) {
+                var $expand = $('<i class="fa fa-plus-circle sn-org-expand" title="Déplier"></i>');
+                $expand.on('click', function (ev) {
+                    ev.stopPropagation();
+                    $expand.remove();
+                    loadOrgChartChildren(oc, $node, node);
+                });
+                $node.append($expand);
+            }
+        }
     });
     
     // Gérer les clics sur les nœuds
@@ -380,6 +471,23 @@ function renderOrgChart(data) {
     });
 }
 
+/**
+ * Charger les sous-structures d'un nœud de l'organigramme
+ */
+function loadOrgChartChildren(oc, $node, node) {
+    ajax.jsonRpc('/organigramme/api/tree/children', 'call', {
+        model: node.model,
+        id: node.id,
+        limit: 200
+    }).then(function (result) {
+        if (result.children.length) {
+            oc.addChildren($node, result.children);
+        }
+    }).catch(function (error) {
+        console.error('Erreur lors du chargement des sous-structures:', error);
+    });
+}
+
 /**
  * Initialisation au chargement de la page
  */
@@ -422,6 +530,7 @@ return {
     downloadQRCode: downloadQRCode,
     showToast: showToast,
     loadOrgChart: loadOrgChart,
+    loadOrgChartChildren: loadOrgChartChildren,
 };
 
 });
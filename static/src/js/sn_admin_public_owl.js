@@ -20,6 +20,23 @@ async function jsonRpc(url, params = {}) {
     throw new Error('Invalid JSON-RPC response');
 }
 
+// Profondeur du premier affichage: le reste est chargé à la demande
+const INITIAL_DEPTH = 2;
+
+// Arbre public servi tel quel depuis le cache serveur
+async function fetchTree(ministryId) {
+    const params = new URLSearchParams({ depth: INITIAL_DEPTH });
+    if (ministryId) {
+        params.set('ministry_id', ministryId);
+    }
+    const url = `/organigramme/api/tree.json?${params.toString()}`;
+    const res = await fetch(url, { credentials: 'same-origin' });
+    if (!res.ok) {
+        throw new Error(`HTTP ${res.status}`);
+    }
+    return res.json();
+}
+
 function nodeUrlForModel(model, id) {
     switch (model) {
         case 'sn.ministry':
@@ -85,20 +102,64 @@ function buildTreeElement(node) {
 
     li.appendChild(title);
 
-    if (Array.isArray(node.children) && node.children.length) {
-        const childrenUl = document.createElement('ul');
-        childrenUl.className = 'sn-org-children list-unstyled ps-3 ms-2 border-start';
-        for (const child of node.children) {
-            const childTree = buildTreeElement(child);
-            childrenUl.appendChild(childTree.firstChild);
-        }
+    const children = Array.isArray(node.children) ? node.children : [];
+    const childrenUl = document.createElement('ul');
+    childrenUl.className = 'sn-org-children list-unstyled ps-3 ms-2 border-start';
+    appendChildren(childrenUl, children);
+    if (children.length) {
         li.appendChild(childrenUl);
     }
 
+    // Nœud non (entièrement) chargé: bouton pour déplier à la demande
+    if (node.model && (node.children_count || 0) > children.length) {
+        const expand = document.createElement('button');
+        expand.type = 'button';
+        expand.className = 'btn btn-sm btn-link p-0 sn-org-expand';
+        expand.textContent = children.length ? 'Afficher plus' : '+';
+        expand.addEventListener('click', async (ev) => {
+            ev.stopPropagation();
+            expand.disabled = true;
+            try {
+                const loaded = childrenUl.children.length;
+                const page = await jsonRpc('/organigramme/api/tree/children', {
+                    model: node.model,
+                    id: node.id,
+                    offset: loaded,
+                });
+                appendChildren(childrenUl, page.children);
+                if (!childrenUl.parentNode) {
+                    li.appendChild(childrenUl);
+                }
+                if (loaded + page.children.length >= page.total) {
+                    expand.remove();
+                } else {
+                    expand.textContent = 'Afficher plus';
+                    expand.disabled = false;
+                }
+            } catch (err) {
+                expand.disabled = false;
+                // eslint-disable-next-line no-console
+                console.error('OrgChart expand error:', err);
+            }
+        });
+        if (children.length) {
+            li.appendChild(expand);
+        } else {
+            title.appendChild(expand);
+        }
+    }
+
     ul.appendChild(li);
     return ul;
 }
 
+function appendChildren(childrenUl, children) {
+    for (const child of children) {
+        const childTree = buildTreeElement(child);
+        childrenUl.appendChild(childTree.firstChild);
+    }
+}
+
 async function initPublicOrgChart() {
     const container = document.getElementById('orgchart-container');
     if (!container) return;
@@ -109,7 +170,7 @@ async function initPublicOrgChart() {
     try {
         const ministryIdAttr = container.getAttribute('data-ministry-id');
         const ministry_id = ministryIdAttr ? parseInt(ministryIdAttr, 10) : undefined;
-        const result = await jsonRpc('/organigramme/api/tree', { ministry_id });
+        const result = await fetchTree(ministry_id);
         renderTree(container, result);
     } catch (err) {
         // error display
@@ -4,6 +4,9 @@ import { Component, useState, onWillStart, onMounted } from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
 
+// Profondeur du premier affichage: le reste est chargé à la demande
+const INITIAL_DEPTH = 2;
+
 /**
  * Widget Organigramme pour le back-office Odoo
  * Utilise OrgChart.js pour afficher la hiérarchie interactive
@@ -41,7 +44,7 @@ export class OrgChartWidget extends Component {
                 "sn.ministry",
                 "get_orgchart_data",
                 [ministryId],
-                {}
+                { depth: INITIAL_DEPTH }
             );
             
             this.state.data = result;
@@ -104,20 +107,64 @@ export class OrgChartWidget extends Component {
 
         li.appendChild(title);
 
-        if (Array.isArray(node.children) && node.children.length) {
-            const childrenUl = document.createElement('ul');
-            childrenUl.className = 'sn-org-children list-unstyled ps-3 ms-2 border-start';
-            for (const child of node.children) {
-                const childTree = this._buildTreeElement(child);
-                childrenUl.appendChild(childTree.firstChild);
-            }
+        const children = Array.isArray(node.children) ? node.children : [];
+        const childrenUl = document.createElement('ul');
+        childrenUl.className = 'sn-org-children list-unstyled ps-3 ms-2 border-start';
+        this._appendChildren(childrenUl, children);
+        if (children.length) {
             li.appendChild(childrenUl);
         }
 
+        // Nœud non (entièrement) chargé: bouton pour déplier à la demande
+        if (node.model && (node.children_count || 0) > children.length) {
+            const expand = document.createElement('button');
+            expand.type = 'button';
+            expand.className = 'btn btn-sm btn-link p-0 sn-org-expand';
+            expand.textContent = children.length ? 'Afficher plus' : '+';
+            expand.addEventListener('click', async (ev) => {
+                ev.stopPropagation();
+                expand.disabled = true;
+                try {
+                    const loaded = childrenUl.children.length;
+                    const page = await this.orm.call(
+                        "sn.hierarchy",
+                        "get_children",
+                        [node.model, node.id],
+                        { offset: loaded }
+                    );
+                    this._appendChildren(childrenUl, page.children);
+                    if (!childrenUl.parentNode) {
+                        li.appendChild(childrenUl);
+                    }
+                    if (loaded + page.children.length >= page.total) {
+                        expand.remove();
+                    } else {
+                        expand.textContent = 'Afficher plus';
+                        expand.disabled = false;
+                    }
+                } catch (error) {
+                    expand.disabled = false;
+                    console.error("Erreur lors du chargement des sous-structures:", error);
+                }
+            });
+            if (children.length) {
+                li.appendChild(expand);
+            } else {
+                title.appendChild(expand);
+            }
+        }
+
         ul.appendChild(li);
         return ul;
     }
 
+    _appendChildren(childrenUl, children) {
+        for (const child of children) {
+            const childTree = this._buildTreeElement(child);
+            childrenUl.appendChild(childTree.firstChild);
+        }
+    }
+
     /**
      * Template HTML pour chaque nœud
      */
@@ -126,6 +173,7 @@ export class OrgChartWidget extends Component {
             'presidency': '#E31B23',
             'primature': '#0066CC',
             'ministry': '#00853F',
+            'category': '#8BC34A',
             'direction': '#FDEF42',
             'service': '#CCCCCC',
             'agent': '#FFFFFF',
@@ -135,6 +183,7 @@ export class OrgChartWidget extends Component {
             'presidency': 'fa-landmark',
             'primature': 'fa-building',
             'ministry': 'fa-building',
+            'category': 'fa-folder-open',
             'direction': 'fa-sitemap',
             'service': 'fa-briefcase',
             'agent': 'fa-user',
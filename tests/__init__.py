@@ -2,3 +2,10 @@ from . import test_ministry
 from . import test_direction
 from . import test_service
 from . import test_agent
+from . import test_hierarchy
+from . import test_qr_code
+from . import test_filters
+from . import test_statistics
+from . import test_search
+from . import test_autocomplete
+from . import test_http_cache
@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.sn_admin.models import sn_autocomplete
+from odoo.addons.sn_admin.models.sn_autocomplete import normalize_tokens
+
+
+class TestAutocomplete(TransactionCase):
+
+    def setUp(self):
+        super(TestAutocomplete, self).setUp()
+        self.Autocomplete = self.env['sn.autocomplete']
+        self.Hierarchy = self.env['sn.hierarchy']
+        # L'index est propre au worker: repartir des données de ce test
+        self.Autocomplete._invalidate_index()
+        self.addCleanup(self.Autocomplete._invalidate_index)
+
+        self.ministry = self.env['sn.ministry'].create({
+            'name': 'Ministère de la Pêche Test',
+            'code': 'MPT',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.direction = self.env['sn.direction'].create({
+            'name': 'Direction des Pêches Maritimes',
+            'code': 'DPM',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.service = self.env['sn.service'].create({
+            'name': 'Service Halieutique',
+            'code': 'SHT',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        })
+        self.agent = self.env['sn.agent'].create({
+            'name': 'Fatou Sarr',
+            'function': 'Inspectrice halieutique',
+            'service_id': self.service.id,
+            'state': 'active',
+        })
+
+    def _keys(self, text):
+        return [(result['type'], result['id']) for result in self.Autocomplete.autocomplete(text, limit=50)]
+
+    def test_normalize_tokens(self):
+        """Test lowercase and accent-free tokens"""
+        self.assertEqual(normalize_tokens("Ministère de l'Économie"), ['ministere', 'de', 'l', 'economie'])
+
+    def test_prefix_lookup(self):
+        """Test accent-insensitive prefix suggestions, structures first"""
+        keys = self._keys('halieu')
+        self.assertLess(keys.index(('service', self.service.id)), keys.index(('agent', self.agent.id)))
+
+        self.assertIn(('ministry', self.ministry.id), self._keys('peche'))
+        self.assertIn(('direction', self.direction.id), self._keys('Pêches mari'))
+        self.assertNotIn(('direction', self.direction.id), self._keys('Pêches fluv'))
+        self.assertEqual(self.Autocomplete.autocomplete('pe'), [])
+
+    def test_incremental_update(self):
+        """Test that the index follows writes through the hierarchy version"""
+        self.assertIn(('agent', self.agent.id), self._keys('fatou'))
+        index = self.Autocomplete._get_index()
+
+        self.agent.name = 'Fatoumata Sarr'
+        self.service.state = 'archived'
+        self.Hierarchy._increment_version()
+
+        self.assertIn(('agent', self.agent.id), self._keys('fatoumata'))
+        self.assertNotIn(('service', self.service.id), self._keys('halieu'))
+        # Mise à jour en place, sans reconstruction
+        self.assertIs(self.Autocomplete._get_index(), index)
+
+        self.agent.unlink()
+        self.Hierarchy._increment_version()
+        self.assertNotIn(('agent', self.agent.id), self._keys('fatoumata'))
+
+    def test_rebuild_after_many_changes(self):
+        """Test that too many changes rebuild the index instead of updating it in place"""
+        index = self.Autocomplete._get_index()
+        self.assertEqual(index.count('sn.agent'), self.env['sn.agent'].search_count([('state', '=', 'active')]))
+
+        self.agent.name = 'Fatoumata Sarr'
+        self.Hierarchy._increment_version()
+        with patch.object(sn_autocomplete, 'AUTOCOMPLETE_REBUILD_THRESHOLD', 1):
+            self.assertIsNot(self.Autocomplete._get_index(), index)
+        self.assertIn(('agent', self.agent.id), self._keys('fatoumata'))
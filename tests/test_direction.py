@@ -104,7 +104,7 @@ class TestDirection(TransactionCase):
                 'direction_id': direction.id,
             })
         
-        direction._compute_service_count()
+        self.env['sn.hierarchy'].recompute_counters()
         self.assertEqual(direction.service_count, 4)
 
     def test_compute_agent_count(self):
@@ -149,7 +149,7 @@ class TestDirection(TransactionCase):
                 'service_id': service2.id,
             })
         
-        direction._compute_agent_count()
+        self.env['sn.hierarchy'].recompute_counters()
         self.assertEqual(direction.agent_count, 5)
 
     def test_action_view_services(self):
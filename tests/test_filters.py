@@ -0,0 +1,57 @@
+import json
+
+from odoo.tests.common import TransactionCase
+
+
+class TestFilters(TransactionCase):
+
+    def setUp(self):
+        super(TestFilters, self).setUp()
+        self.Hierarchy = self.env['sn.hierarchy']
+        self.Direction = self.env['sn.direction']
+
+        self.ministry = self.env['sn.ministry'].create({
+            'name': 'Ministère Test',
+            'code': 'TEST',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.category = self.env['sn.category'].create({
+            'name': 'Cabinet',
+            'code': 'CAB',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.direction = self.Direction.create({
+            'name': 'Direction Test',
+            'code': 'DIR',
+            'ministry_id': self.ministry.id,
+            'category_id': self.category.id,
+            'state': 'active',
+        })
+        self.service = self.env['sn.service'].create({
+            'name': 'Service Test',
+            'code': 'SRV',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        })
+
+    def test_filter_options(self):
+        """Test the search filter options, cached per hierarchy version"""
+        options = json.loads(self.Hierarchy.get_filter_options_json('sn.direction', self.ministry.id))
+        self.assertEqual(options, [{'id': self.direction.id, 'name': 'Direction Test'}])
+        options = json.loads(self.Hierarchy.get_filter_options_json('sn.service', self.direction.id))
+        self.assertEqual(options, [{'id': self.service.id, 'name': 'Service Test'}])
+
+        other = self.Direction.create({
+            'name': 'Autre Direction',
+            'code': 'ADT',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.Hierarchy._increment_version()
+        options = json.loads(self.Hierarchy.get_filter_options_json('sn.direction', self.ministry.id))
+        self.assertEqual([option['id'] for option in options], [other.id, self.direction.id])
+
+        with self.assertRaises(ValueError):
+            self.Hierarchy.get_filter_options_json('sn.agent', self.service.id)
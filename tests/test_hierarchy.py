@@ -0,0 +1,415 @@
+import json
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.sn_admin.models.hierarchy import CHILDREN_MAX_PAGE_SIZE
+
+
+class TestHierarchy(TransactionCase):
+
+    def setUp(self):
+        super(TestHierarchy, self).setUp()
+        self.Hierarchy = self.env['sn.hierarchy']
+        self.Ministry = self.env['sn.ministry']
+        self.Category = self.env['sn.category']
+        self.Direction = self.env['sn.direction']
+        self.Service = self.env['sn.service']
+        self.Agent = self.env['sn.agent']
+
+        self.ministry = self.Ministry.create({
+            'name': 'Ministère Test',
+            'code': 'TEST',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.category = self.Category.create({
+            'name': 'Cabinet',
+            'code': 'CAB',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.direction = self.Direction.create({
+            'name': 'Direction Test',
+            'code': 'DIR',
+            'ministry_id': self.ministry.id,
+            'category_id': self.category.id,
+            'state': 'active',
+        })
+        self.service = self.Service.create({
+            'name': 'Service Test',
+            'code': 'SRV',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        })
+
+    def test_get_tree_ministry(self):
+        """Test the tree of a single ministry"""
+        for i in range(3):
+            self.Agent.create({
+                'name': f'Agent {i}',
+                'function': 'Test',
+                'service_id': self.service.id,
+                'state': 'active',
+            })
+        self.Agent.create({
+            'name': 'Agent Brouillon',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+
+        tree = self.Hierarchy.get_tree(ministry_id=self.ministry.id)
+        self.assertEqual(tree['id'], self.ministry.id)
+        self.assertEqual(tree['type'], 'ministry')
+        self.assertEqual(tree['title'], 'TEST')
+
+        category_node = tree['children'][0]
+        self.assertEqual(category_node['type'], 'category')
+        self.assertEqual(category_node['model'], 'sn.category')
+
+        direction_node = category_node['children'][0]
+        self.assertEqual(direction_node['id'], self.direction.id)
+
+        service_node = direction_node['children'][0]
+        self.assertEqual(service_node['id'], self.service.id)
+        self.assertEqual(len(service_node['children']), 3)
+        self.assertEqual(service_node['children'][0]['type'], 'agent')
+
+    def test_get_tree_without_category(self):
+        """Test that directions hang directly under a ministry without categories"""
+        self.category.state = 'draft'
+        tree = self.Hierarchy.get_tree(ministry_id=self.ministry.id)
+        self.assertEqual(tree['children'][0]['type'], 'direction')
+        self.assertEqual(tree['children'][0]['id'], self.direction.id)
+
+    def test_get_tree_root(self):
+        """Test the full tree root node"""
+        tree = self.Hierarchy.get_tree()
+        self.assertEqual(tree['type'], 'root')
+        self.assertIn(self.ministry.id, [node['id'] for node in tree['children']])
+
+    def test_get_tree_unknown_ministry(self):
+        """Test that an unknown ministry returns an empty tree"""
+        self.assertEqual(self.Hierarchy.get_tree(ministry_id=-1), {})
+
+    def test_get_tree_depth(self):
+        """Test that depth cuts the tree but keeps children_count"""
+        tree = self.Hierarchy.get_tree(ministry_id=self.ministry.id, depth=1)
+        category_node = tree['children'][0]
+        self.assertEqual(category_node['children'], [])
+        self.assertEqual(category_node['children_count'], 1)
+
+    def test_get_tree_levels(self):
+        """Test that excluded levels are skipped"""
+        tree = self.Hierarchy.get_tree(
+            ministry_id=self.ministry.id,
+            levels=['direction', 'service'],
+        )
+        direction_node = tree['children'][0]
+        self.assertEqual(direction_node['type'], 'direction')
+        service_node = direction_node['children'][0]
+        self.assertEqual(service_node['children'], [])
+        self.assertNotIn('children_count', service_node)
+
+    def test_get_tree_limits(self):
+        """Test the per-level child cap"""
+        for i in range(5):
+            self.Agent.create({
+                'name': f'Agent {i}',
+                'function': 'Test',
+                'service_id': self.service.id,
+                'state': 'active',
+            })
+        tree = self.Hierarchy.get_tree(ministry_id=self.ministry.id, limits={'agent': 2})
+        service_node = tree['children'][0]['children'][0]['children'][0]
+        self.assertEqual(len(service_node['children']), 2)
+        self.assertEqual(service_node['children_count'], 5)
+
+    def test_get_orgchart_data_shared_engine(self):
+        """Test that the backend orgchart uses the shared engine"""
+        self.assertEqual(
+            self.Ministry.get_orgchart_data(self.ministry.id),
+            self.Hierarchy.get_tree(ministry_id=self.ministry.id),
+        )
+
+    def test_version_bump(self):
+        """Test that writes on the hierarchy bump the version once per transaction"""
+        self.env.cr.flush()
+        version = self.Hierarchy._get_version()
+
+        self.direction.name = 'Direction Renommée'
+        self.service.name = 'Service Renommé'
+        self.assertEqual(self.Hierarchy._get_version(), version)
+
+        self.env.cr.flush()
+        self.assertEqual(self.Hierarchy._get_version(), version + 1)
+
+    def test_version_bump_public_fields(self):
+        """Test that only writes on publicly rendered fields bump the version"""
+        self.env.cr.flush()
+        version = self.Hierarchy._get_version()
+
+        self.direction.fax = '33 800 00 00'
+        self.Agent.create({'name': 'Agent Brouillon', 'function': 'Test', 'service_id': self.service.id})
+        self.env.cr.flush()
+        self.assertEqual(self.Hierarchy._get_version(), version)
+
+        self.direction.phone = '33 800 00 01'
+        self.env.cr.flush()
+        self.assertEqual(self.Hierarchy._get_version(), version + 1)
+
+    def test_version_bump_settings(self):
+        """Test that sn_admin.* settings bump the version, other parameters do not"""
+        IrConfigParameter = self.env['ir.config_parameter'].sudo()
+        self.env.cr.flush()
+        version = self.Hierarchy._get_version()
+
+        IrConfigParameter.set_param('mail.catchall.domain', 'example.sn')
+        self.env.cr.flush()
+        self.assertEqual(self.Hierarchy._get_version(), version)
+
+        show_phone = IrConfigParameter.get_param('sn_admin.show_phone_public', 'True')
+        IrConfigParameter.set_param('sn_admin.show_phone_public', 'False' if show_phone == 'True' else 'True')
+        self.env.cr.flush()
+        self.assertEqual(self.Hierarchy._get_version(), version + 1)
+
+    def test_public_tree_json_cache(self):
+        """Test that the cached tree follows the hierarchy version"""
+        self.env.cr.flush()
+        tree_json = self.Hierarchy.get_public_tree_json(ministry_id=self.ministry.id)
+        self.assertIn(b'Direction Test', tree_json)
+
+        self.direction.name = 'Direction Renommée'
+        self.env.cr.flush()
+        tree_json = self.Hierarchy.get_public_tree_json(ministry_id=self.ministry.id)
+        self.assertIn('Direction Renommée'.encode('utf-8'), tree_json)
+
+    def test_get_children(self):
+        """Test the paged lazy expansion of a node"""
+        for i in range(3):
+            self.Agent.create({
+                'name': f'Agent {i}',
+                'function': 'Test',
+                'service_id': self.service.id,
+                'state': 'active',
+            })
+
+        result = self.Hierarchy.get_children('sn.ministry', self.ministry.id)
+        self.assertEqual(result['total'], 1)
+        self.assertEqual(result['children'][0]['type'], 'category')
+        self.assertEqual(result['children'][0]['children_count'], 1)
+
+        result = self.Hierarchy.get_children('sn.direction', self.direction.id)
+        self.assertEqual(result['children'][0]['id'], self.service.id)
+        self.assertEqual(result['children'][0]['children_count'], 3)
+
+        result = self.Hierarchy.get_children('sn.service', self.service.id, offset=1, limit=1)
+        self.assertEqual(result['total'], 3)
+        self.assertEqual(len(result['children']), 1)
+        self.assertNotIn('children_count', result['children'][0])
+
+        # Bornes: offset négatif ramené à 0, limit ramenée à 1..CHILDREN_MAX_PAGE_SIZE
+        result = self.Hierarchy.get_children('sn.service', self.service.id, offset=-5, limit=-1)
+        self.assertEqual((result['offset'], result['limit']), (0, 1))
+        self.assertEqual(len(result['children']), 1)
+        result = self.Hierarchy.get_children('sn.service', self.service.id, limit=10 ** 6)
+        self.assertEqual(result['limit'], CHILDREN_MAX_PAGE_SIZE)
+
+    def test_get_children_root(self):
+        """Test that the root children are the published ministries"""
+        result = self.Hierarchy.get_children()
+        self.assertIn(self.ministry.id, [node['id'] for node in result['children']])
+
+    def test_agent_preview_limit_parameter(self):
+        """Test that the agent preview follows the configuration parameter"""
+        for i in range(4):
+            self.Agent.create({
+                'name': f'Agent {i}',
+                'function': 'Test',
+                'service_id': self.service.id,
+                'state': 'active',
+            })
+        self.env['ir.config_parameter'].sudo().set_param('sn_admin.orgchart_agent_limit', 3)
+
+        tree = self.Hierarchy.get_tree(ministry_id=self.ministry.id)
+        service_node = tree['children'][0]['children'][0]['children'][0]
+        self.assertEqual([node['name'] for node in service_node['children']], ['Agent 0', 'Agent 1', 'Agent 2'])
+        self.assertEqual(service_node['children_count'], 4)
+
+    def test_hierarchy_path(self):
+        """Test the materialized hierarchy path and subtree lookups"""
+        agent = self.Agent.create({
+            'name': 'Agent Test',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+        self.assertEqual(self.ministry.hierarchy_path, f'M{self.ministry.id}/')
+        self.assertEqual(
+            agent.hierarchy_path,
+            f'M{self.ministry.id}/C{self.category.id}/D{self.direction.id}/S{self.service.id}/A{agent.id}/',
+        )
+        self.assertEqual(self.category._get_descendants('sn.agent'), agent)
+        self.assertEqual(self.ministry._get_descendants('sn.service'), self.service)
+
+        # Déplacer la direction hors de la catégorie met à jour toute la branche
+        self.direction.category_id = False
+        self.assertEqual(
+            agent.hierarchy_path,
+            f'M{self.ministry.id}/D{self.direction.id}/S{self.service.id}/A{agent.id}/',
+        )
+        self.assertFalse(self.category._get_descendants('sn.agent'))
+
+    def test_tree_export_chunks(self):
+        """Test that the streamed export is valid NDJSON and JSON"""
+        lines = b''.join(self.Hierarchy._iter_tree_chunks('ndjson')).splitlines()
+        self.assertEqual(json.loads(lines[0])['type'], 'root')
+        ministries = [json.loads(line) for line in lines[1:]]
+        self.assertIn(self.ministry.id, [node['id'] for node in ministries])
+
+        tree = json.loads(b''.join(self.Hierarchy._iter_tree_chunks('json')))
+        self.assertEqual(tree['type'], 'root')
+        self.assertEqual(len(tree['children']), len(ministries))
+
+    def test_tree_export_agents(self):
+        """Test that the export streams every agent per service, up to the cap"""
+        for i in range(3):
+            self.Agent.create({
+                'name': f'Agent {i}',
+                'function': 'Test',
+                'service_id': self.service.id,
+                'state': 'active',
+            })
+
+        def export_service(agent_limit):
+            lines = b''.join(self.Hierarchy._iter_tree_chunks('ndjson', agent_limit=agent_limit)).splitlines()
+            ministry = next(node for node in map(json.loads, lines[1:]) if node['id'] == self.ministry.id)
+            return ministry['children'][0]['children'][0]['children'][0]
+
+        service_node = export_service(None)
+        self.assertEqual(service_node['id'], self.service.id)
+        self.assertEqual(service_node['children_count'], 3)
+        self.assertEqual([node['name'] for node in service_node['children']], ['Agent 0', 'Agent 1', 'Agent 2'])
+
+        # Le plafond coupe les agents, pas les compteurs
+        service_node = export_service(0)
+        self.assertEqual(service_node['children'], [])
+        self.assertEqual(service_node['children_count'], 3)
+
+    def test_counters_deltas(self):
+        """Test that counters follow create, archive, move and unlink"""
+        agents = self.Agent.create([{
+            'name': f'Agent {i}',
+            'function': 'Test',
+            'service_id': self.service.id,
+        } for i in range(3)])
+        self.assertEqual(self.service.agent_count, 3)
+        self.assertEqual(self.direction.agent_count, 3)
+        self.assertEqual(self.ministry.agent_count, 3)
+        self.assertEqual(self.ministry.service_count, 1)
+        self.assertEqual(self.ministry.direction_count, 1)
+        self.assertEqual(self.ministry.category_count, 1)
+        self.assertEqual(self.category.direction_count, 1)
+
+        agents[0].action_archive()
+        self.assertEqual(self.service.agent_count, 2)
+        self.assertEqual(self.ministry.agent_count, 2)
+
+        agents[1].unlink()
+        self.assertEqual(self.direction.agent_count, 1)
+        self.assertEqual(self.ministry.agent_count, 1)
+
+        # Déplacer un service emporte ses agents
+        other_direction = self.Direction.create({
+            'name': 'Autre Direction',
+            'code': 'DIR2',
+            'ministry_id': self.ministry.id,
+        })
+        self.service.direction_id = other_direction
+        self.assertEqual(self.direction.service_count, 0)
+        self.assertEqual(self.direction.agent_count, 0)
+        self.assertEqual(other_direction.agent_count, 1)
+        self.assertEqual(self.ministry.service_count, 1)
+        self.assertEqual(self.ministry.agent_count, 1)
+
+        # Une direction archivée ne compte plus pour son ministère
+        other_direction.action_archive()
+        self.assertEqual(self.ministry.direction_count, 1)
+        self.assertEqual(self.ministry.agent_count, 0)
+
+    def test_recompute_counters(self):
+        """Test that the repair recompute matches the maintained counters"""
+        self.Agent.create({
+            'name': 'Agent Test',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+        self.env.cr.execute("UPDATE sn_ministry SET agent_count = 42 WHERE id = %s", [self.ministry.id])
+        self.ministry.invalidate_recordset(['agent_count'])
+
+        self.Hierarchy.recompute_counters()
+        self.assertEqual(self.ministry.agent_count, 1)
+        self.assertEqual(self.direction.agent_count, 1)
+
+    def test_published_counters(self):
+        """Test the counters restricted to published records"""
+        agents = self.Agent.create([{
+            'name': f'Agent {i}',
+            'function': 'Test',
+            'service_id': self.service.id,
+            'state': 'active',
+        } for i in range(3)])
+        self.Agent.create({
+            'name': 'Agent Brouillon',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+        self.assertEqual(self.service.published_agent_count, 3)
+        self.assertEqual(self.direction.published_service_count, 1)
+        self.assertEqual(self.direction.published_agent_count, 3)
+        self.assertEqual(self.ministry.published_direction_count, 1)
+        self.assertEqual(self.ministry.published_agent_count, 3)
+        self.assertEqual(self.category.published_direction_count, 1)
+
+        agents[0].action_archive()
+        self.assertEqual(self.ministry.published_agent_count, 2)
+
+        self.service.state = 'draft'
+        self.assertEqual(self.direction.published_agent_count, 0)
+        self.assertEqual(self.ministry.published_service_count, 0)
+
+    def test_published_totals(self):
+        """Test the portal totals aggregate"""
+        totals = self.Ministry.get_published_totals()
+        self.assertGreaterEqual(totals['ministries'], 1)
+        self.assertGreaterEqual(totals['directions'], 1)
+        self.assertGreaterEqual(totals['by_type'].get('ministry', 0), 1)
+
+    def test_category_service_count(self):
+        """Test the stored service count of a category"""
+        self.Service.create({
+            'name': 'Service Deux',
+            'code': 'SRV2',
+            'direction_id': self.direction.id,
+        })
+        self.assertEqual(self.service.category_id, self.category)
+        self.assertEqual(self.category.service_count, 2)
+        self.assertIn(self.category, self.Category.search([('service_count', '>=', 2)]))
+
+        self.direction.category_id = False
+        self.assertEqual(self.category.service_count, 0)
+
+    def test_deferred_counters(self):
+        """Test that deferred counters are recomputed in one pass before commit"""
+        self.Service.with_context(sn_admin_defer_counters=True).create([{
+            'name': f'Service Différé {i}',
+            'code': f'DEF{i}',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        } for i in range(3)])
+        self.assertEqual(self.direction.service_count, 1)
+
+        self.env.cr.flush()
+        self.assertEqual(self.direction.service_count, 4)
+        self.assertEqual(self.direction.published_service_count, 4)
+        self.assertEqual(self.ministry.service_count, 4)
+        self.assertEqual(self.ministry.published_service_count, 4)
+        self.assertEqual(self.category.service_count, 4)
@@ -0,0 +1,50 @@
+from odoo.tests import HttpCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestHttpCache(HttpCase):
+
+    def setUp(self):
+        super(TestHttpCache, self).setUp()
+        self.Hierarchy = self.env['sn.hierarchy']
+        self.ministry = self.env['sn.ministry'].create({
+            'name': 'Ministère Cache Test',
+            'code': 'MCT',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.env['sn.direction'].create({
+            'name': 'Direction Cache Test',
+            'code': 'DCT',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+
+    def test_json_not_modified(self):
+        """Test the If-None-Match 304 path and the public Cache-Control of JSON responses"""
+        url = f'/organigramme/api/filters/directions?ministry_id={self.ministry.id}'
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Direction Cache Test', response.content)
+        self.assertEqual(response.headers['Cache-Control'], 'public, no-cache')
+        etag = response.headers['ETag']
+
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        # Une nouvelle version de la hiérarchie invalide l'ETag
+        self.Hierarchy._increment_version()
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_page_private_cache(self):
+        """Test that rendered pages are only cacheable by the browser"""
+        response = self.url_open('/organigramme')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+
+        response = self.url_open('/organigramme', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
@@ -69,7 +69,7 @@ class TestMinistry(TransactionCase):
                 'ministry_id': ministry.id,
             })
         
-        ministry._compute_direction_count()
+        self.env['sn.hierarchy'].recompute_counters()
         self.assertEqual(ministry.direction_count, 3)
 
     def test_compute_service_count(self):
@@ -108,7 +108,7 @@ class TestMinistry(TransactionCase):
                 'direction_id': direction2.id,
             })
         
-        ministry._compute_service_count()
+        self.env['sn.hierarchy'].recompute_counters()
         self.assertEqual(ministry.service_count, 5)
 
     def test_compute_agent_count(self):
@@ -153,7 +153,7 @@ class TestMinistry(TransactionCase):
                 'service_id': service2.id,
             })
         
-        ministry._compute_agent_count()
+        self.env['sn.hierarchy'].recompute_counters()
         self.assertEqual(ministry.agent_count, 5)
 
     def test_action_view_directions(self):
@@ -0,0 +1,150 @@
+import io
+import zipfile
+
+from odoo.tests.common import TransactionCase
+
+
+class TestQrCode(TransactionCase):
+
+    def setUp(self):
+        super(TestQrCode, self).setUp()
+        self.Direction = self.env['sn.direction']
+        self.Agent = self.env['sn.agent']
+
+        self.ministry = self.env['sn.ministry'].create({
+            'name': 'Ministère Test',
+            'code': 'TEST',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.category = self.env['sn.category'].create({
+            'name': 'Cabinet',
+            'code': 'CAB',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.direction = self.Direction.create({
+            'name': 'Direction Test',
+            'code': 'DIR',
+            'ministry_id': self.ministry.id,
+            'category_id': self.category.id,
+            'state': 'active',
+        })
+        self.service = self.env['sn.service'].create({
+            'name': 'Service Test',
+            'code': 'SRV',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        })
+
+    def test_qr_code_cache(self):
+        """Test that QR images are rendered once and served from the cache"""
+        QrCode = self.env['sn.qr.code']
+        url = self.direction.qr_code_url
+        image = self.direction._get_qr_code_image(size=150)
+        self.assertTrue(image.startswith(b'\x89PNG'))
+
+        name = QrCode._get_attachment_name(QrCode._get_cache_key(url, 150, 'png'), 'png')
+        attachment = self.env['ir.attachment'].search([('res_model', '=', 'sn.qr.code'), ('name', '=', name)])
+        self.assertEqual(len(attachment), 1)
+
+        # Une taille non prédéfinie est servie par l'image de la taille la plus proche
+        self.assertEqual(QrCode.get_image(url, size=150), image)
+        self.assertEqual(QrCode.get_image(url, size=137), image)
+        self.assertEqual(
+            self.env['ir.attachment'].search_count([('res_model', '=', 'sn.qr.code'), ('name', '=', name)]),
+            1,
+        )
+        self.assertTrue(self.direction.qr_code)
+
+        # Une demande anonyme ne remplit pas le cache
+        public_image = QrCode.with_user(self.env.ref('base.public_user')).sudo().get_image(url, size=300)
+        self.assertTrue(public_image.startswith(b'\x89PNG'))
+        name = QrCode._get_attachment_name(QrCode._get_cache_key(url, 300, 'png'), 'png')
+        self.assertFalse(self.env['ir.attachment'].search_count([('res_model', '=', 'sn.qr.code'), ('name', '=', name)]))
+
+    def test_qr_code_batch_generation(self):
+        """Test that the batch job refreshes stale URLs, purges them and renders them again"""
+        QrCode = self.env['sn.qr.code']
+        Attachment = self.env['ir.attachment']
+        # Enregistrements anciens: seul le service, dont l'image est en cache, est rendu de nouveau
+        self.env.flush_all()
+        for record in (self.service, self.direction):
+            self.env.cr.execute(
+                f"UPDATE {record._table} SET create_date = now() - interval '1 week' WHERE id = %s", [record.id],
+            )
+        old_url = self.service.qr_code_url
+        self.service._get_qr_code_image(size=64)
+        old_name = QrCode._get_attachment_name(QrCode._get_cache_key(old_url, 64, 'png'), 'png')
+        self.assertTrue(Attachment.search_count([('res_model', '=', 'sn.qr.code'), ('name', '=', old_name)]))
+
+        IrConfigParameter = self.env['ir.config_parameter'].sudo()
+        IrConfigParameter.set_param('web.base.url', 'https://annuaire.example.sn')
+
+        QrCode._cron_generate_qr_codes(size=64)
+        self.assertEqual(self.service.qr_code_url, f'https://annuaire.example.sn/organigramme/service/{self.service.id}')
+        self.assertFalse(Attachment.search_count([('res_model', '=', 'sn.qr.code'), ('name', '=', old_name)]))
+
+        name = QrCode._get_attachment_name(QrCode._get_cache_key(self.service.qr_code_url, 64, 'png'), 'png')
+        self.assertTrue(Attachment.search_count([('res_model', '=', 'sn.qr.code'), ('name', '=', name)]))
+        name = QrCode._get_attachment_name(QrCode._get_cache_key(self.direction.qr_code_url, 64, 'png'), 'png')
+        self.assertFalse(Attachment.search_count([('res_model', '=', 'sn.qr.code'), ('name', '=', name)]))
+
+    def test_qr_code_size(self):
+        """Test that requested sizes are snapped to the configured or preset sizes"""
+        QrCode = self.env['sn.qr.code']
+        self.env['ir.config_parameter'].sudo().set_param('sn_admin.qr_code_size', 250)
+        self.assertEqual(QrCode._get_size(), 250)
+        self.assertEqual(QrCode._get_size('abc'), 250)
+        self.assertEqual(QrCode._get_size('240'), 250)
+        self.assertEqual(QrCode._get_size('160'), 150)
+        self.assertEqual(QrCode._get_size(100000), 1200)
+        self.assertEqual(QrCode._get_size(1), 64)
+
+    def test_qr_code_formats(self):
+        """Test the compact 1-bit PNG and the SVG QR code formats"""
+        png = self.direction._get_qr_code_image(size=120, fmt='png')
+        # Profondeur 1 bit dans l'en-tête IHDR
+        self.assertEqual(png[24], 1)
+
+        svg = self.direction._get_qr_code_image(size=120, fmt='svg')
+        self.assertIn(b'<svg', svg)
+
+        data_uri = self.direction.get_qr_code_data_uri()
+        self.assertTrue(data_uri.startswith('data:image/svg+xml;base64,'))
+        with self.assertRaises(ValueError):
+            self.direction._get_qr_code_image(fmt='gif')
+
+    def test_qr_code_sheet(self):
+        """Test the ZIP and label PDF QR code sheets of a ministry and a category"""
+        self.Agent.create({
+            'name': 'Agent QR',
+            'matricule': 'M001',
+            'function': 'Test',
+            'service_id': self.service.id,
+            'state': 'active',
+        })
+        QrCode = self.env['sn.qr.code']
+
+        data = b''.join(QrCode._iter_sheet_chunks(self.ministry, 'zip', size=64))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), [
+                'ministry/qrcode_ministry_TEST.png',
+                'direction/qrcode_direction_DIR.png',
+                'service/qrcode_service_SRV.png',
+                'agent/qrcode_agent_M001.png',
+            ])
+            self.assertTrue(archive.read('agent/qrcode_agent_M001.png').startswith(b'\x89PNG'))
+
+        data = b''.join(QrCode._iter_sheet_chunks(self.category, 'zip', size=64))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertNotIn('ministry/qrcode_ministry_TEST.png', archive.namelist())
+            self.assertEqual(len(archive.namelist()), 3)
+
+        pdf = b''.join(QrCode._iter_sheet_chunks(self.ministry, 'pdf'))
+        self.assertTrue(pdf.startswith(b'%PDF-'))
+        self.assertTrue(pdf.endswith(b'%%EOF\n'))
+        self.assertIn(b'/Count 1', pdf)
+
+        action = self.ministry.with_context(qr_sheet_format='pdf').action_download_qr_codes()
+        self.assertEqual(action['url'], f'/organigramme/qrcode/sheet/sn.ministry/{self.ministry.id}?format=pdf')
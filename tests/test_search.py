@@ -0,0 +1,153 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestSearch(TransactionCase):
+
+    def setUp(self):
+        super(TestSearch, self).setUp()
+        self.Search = self.env['sn.search']
+        self.Agent = self.env['sn.agent']
+
+        self.ministry = self.env['sn.ministry'].create({
+            'name': 'Ministère des Finances Test',
+            'code': 'MFT',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.direction = self.env['sn.direction'].create({
+            'name': 'Direction du Budget',
+            'code': 'DBT',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.service = self.env['sn.service'].create({
+            'name': 'Service de la Programmation',
+            'code': 'SPT',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        })
+        self.agent_name = self.Agent.create({
+            'name': 'Awa Budgetaire',
+            'function': 'Assistante',
+            'service_id': self.service.id,
+            'state': 'active',
+        })
+        self.agent_function = self.Agent.create({
+            'name': 'Moussa Ndiaye',
+            'function': 'Chef du bureau budgétaire',
+            'work_email': 'moussa.ndiaye@finances.gouv.sn',
+            'service_id': self.service.id,
+            'state': 'active',
+        })
+        self.domain = [('active', '=', True), ('state', '=', 'active'), ('ministry_id', '=', self.ministry.id)]
+        self.env.flush_all()
+
+    def test_ranked_search(self):
+        """Test that matches on the name rank above matches on the function"""
+        agents = self.Search.ranked_search('sn.agent', 'budgetaire', self.domain)
+        if self.Search._get_ts_config() == 'french':
+            # Sans unaccent, "budgétaire" ne correspond pas à "budgetaire"
+            self.assertEqual(agents, self.agent_name)
+        else:
+            self.assertEqual(agents.ids, [self.agent_name.id, self.agent_function.id])
+        self.assertEqual(self.Search.ranked_count('sn.agent', 'budgetaire', self.domain), len(agents))
+
+    def test_prefix_and_words(self):
+        """Test prefix matching and that every word must match"""
+        self.assertEqual(self.Search.ranked_search('sn.agent', 'Ndia', self.domain), self.agent_function)
+        self.assertEqual(self.Search.ranked_search('sn.agent', 'Moussa chef', self.domain), self.agent_function)
+        self.assertFalse(self.Search.ranked_search('sn.agent', 'Moussa Awa', self.domain))
+        self.assertFalse(self.Search.ranked_search('sn.agent', '  !? ', self.domain))
+        self.assertEqual(self.Search.ranked_count('sn.agent', '', self.domain), 0)
+
+    def test_search_vector_trigger(self):
+        """Test that the search vector follows writes and covers the structures"""
+        self.agent_name.function = 'Comptable principale'
+        self.env.flush_all()
+        self.assertEqual(self.Search.ranked_search('sn.agent', 'comptable', self.domain), self.agent_name)
+
+        self.assertEqual(
+            self.Search.ranked_search('sn.direction', 'budget', [('ministry_id', '=', self.ministry.id)]),
+            self.direction,
+        )
+        self.assertEqual(self.Search.ranked_search('sn.ministry', 'finances MFT'), self.ministry)
+
+    def test_fuzzy_search(self):
+        """Test substring and misspelled matches in fuzzy mode"""
+        self.assertEqual(
+            self.Search.ranked_search('sn.agent', 'ndiaye@fin', self.domain, mode='fuzzy'),
+            self.agent_function,
+        )
+        if self.env.registry.has_trigram:
+            self.assertEqual(
+                self.Search.ranked_search('sn.agent', 'Mousa Ndiay', self.domain, mode='fuzzy'),
+                self.agent_function,
+            )
+        # Le mode automatique passe en approchant quand le plein texte ne trouve rien
+        self.assertEqual(self.Search.get_search_mode('sn.agent', 'Moussa', self.domain), 'fulltext')
+        self.assertEqual(self.Search.get_search_mode('sn.agent', 'ndiaye@fin', self.domain), 'fuzzy')
+        self.assertEqual(self.Search.get_search_mode('sn.agent', 'Moussa', self.domain, 'fuzzy'), 'fuzzy')
+
+    def test_search_all(self):
+        """Test the unified search across structures and agents with breadcrumbs"""
+        published = [('active', '=', True), ('state', '=', 'active')]
+        results = self.Search.search_all('budget', published, limit=100)
+        by_key = {(result['type'], result['id']): result for result in results}
+
+        direction = by_key['direction', self.direction.id]
+        self.assertEqual(direction['url'], f'/organigramme/direction/{self.direction.id}')
+        self.assertEqual(
+            [(step['type'], step['id']) for step in direction['breadcrumb']],
+            [('ministry', self.ministry.id)],
+        )
+
+        agent = by_key['agent', self.agent_name.id]
+        self.assertEqual(agent['name'], 'Awa Budgetaire')
+        self.assertEqual(agent['function'], 'Assistante')
+        self.assertEqual(
+            [step['name'] for step in agent['breadcrumb']],
+            ['Ministère des Finances Test', 'Direction du Budget', 'Service de la Programmation'],
+        )
+        self.assertEqual(agent['service'], 'Service de la Programmation')
+        self.assertEqual(agent['ministry'], 'Ministère des Finances Test')
+
+        ranks = [result['rank'] for result in results]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        self.assertEqual(len(self.Search.search_all('budget', published, limit=1)), 1)
+
+    def test_keyset_search(self):
+        """Test cursor pagination by name and by relevance"""
+        self.Agent.create([{
+            'name': f'Agent Page {i % 7}',
+            'function': 'Agent budgétaire' if i % 2 else 'Agent comptable',
+            'service_id': self.service.id,
+            'state': 'active',
+        } for i in range(23)])
+        self.env.flush_all()
+
+        def walk(text, cursor=None):
+            pages = []
+            while True:
+                agents, cursor = self.Search.keyset_search('sn.agent', text, self.domain, cursor=cursor, limit=10)
+                pages.append(agents)
+                if not cursor:
+                    return pages
+
+        pages = walk(None)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [agent.id for page in pages for agent in page],
+            self.Agent.search(self.domain, order='name, id').ids,
+        )
+
+        pages = walk('agent')
+        self.assertEqual(
+            [agent.id for page in pages for agent in page],
+            self.Search.ranked_search('sn.agent', 'agent', self.domain).ids,
+        )
+
+        # Un curseur invalide ou d'une autre recherche repart de la première page
+        first, _cursor = self.Search.keyset_search('sn.agent', None, self.domain, limit=10)
+        self.assertEqual(self.Search.keyset_search('sn.agent', None, self.domain, cursor='invalide', limit=10)[0], first)
+        _page, cursor = self.Search.keyset_search('sn.agent', 'agent', self.domain, limit=10)
+        self.assertEqual(self.Search.keyset_search('sn.agent', None, self.domain, cursor=cursor, limit=10)[0], first)
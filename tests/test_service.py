@@ -115,7 +115,7 @@ class TestService(TransactionCase):
                 'service_id': service.id,
             })
         
-        service._compute_agent_count()
+        self.env['sn.hierarchy'].recompute_counters()
         self.assertEqual(service.agent_count, 5)
 
     def test_action_view_agents(self):
@@ -0,0 +1,104 @@
+from datetime import date
+
+from odoo.tests.common import TransactionCase
+
+
+class TestStatistics(TransactionCase):
+
+    def setUp(self):
+        super(TestStatistics, self).setUp()
+        self.Statistics = self.env['sn.statistics']
+
+        self.ministry = self.env['sn.ministry'].create({
+            'name': 'Ministère Test',
+            'code': 'TEST',
+            'type': 'ministry',
+            'state': 'active',
+        })
+        self.direction = self.env['sn.direction'].create({
+            'name': 'Direction Test',
+            'code': 'DIR',
+            'ministry_id': self.ministry.id,
+            'state': 'active',
+        })
+        self.service = self.env['sn.service'].create({
+            'name': 'Service Test',
+            'code': 'SRV',
+            'direction_id': self.direction.id,
+            'state': 'active',
+        })
+        self.env['sn.agent'].create([{
+            'name': f'Agent {i}',
+            'function': 'Test',
+            'service_id': self.service.id,
+            'state': 'active',
+            'is_interim': i == 0,
+        } for i in range(4)])
+
+    def test_refresh(self):
+        """Test that the materialized view follows a refresh"""
+        self.Statistics._refresh()
+        rows = self.Statistics.search([('ministry_id', '=', self.ministry.id), ('level', '=', 'agent')])
+        self.assertEqual(sum(rows.mapped('record_count')), 4)
+        self.assertEqual(sum(rows.mapped('interim_count')), 1)
+
+    def test_get_statistics(self):
+        """Test the per ministry statistics and ratios"""
+        self.Statistics._refresh()
+        stats = self.Statistics.get_statistics()
+        self.assertGreaterEqual(stats['totals']['agent'], 4)
+
+        row = next(row for row in stats['ministries'] if row['ministry'] == self.ministry)
+        self.assertEqual(row['direction'], 1)
+        self.assertEqual(row['service'], 1)
+        self.assertEqual(row['agent'], 4)
+        self.assertEqual(row['interim_ratio'], 0.25)
+
+    def test_snapshot_run_length(self):
+        """Test that unchanged days extend the same snapshot row"""
+        Snapshot = self.env['sn.statistics.snapshot']
+        domain = [('level', '=', 'agent'), ('ministry_id', '=', self.ministry.id)]
+
+        Snapshot._take_snapshot(date(2024, 1, 1))
+        Snapshot._take_snapshot(date(2024, 1, 2))
+        rows = Snapshot.search(domain)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows.date_to, date(2024, 1, 2))
+
+        self.env['sn.agent'].create({
+            'name': 'Agent Nouveau',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+        Snapshot._take_snapshot(date(2024, 1, 3))
+        rows = Snapshot.search(domain, order='date_from')
+        self.assertEqual(rows.mapped('record_count'), [4, 5])
+
+        series = Snapshot.get_series(date(2024, 1, 1), date(2024, 1, 4), ministry_id=self.ministry.id)
+        self.assertEqual([value for _day, value in series], [4, 4, 5, None])
+
+    def test_snapshot_rerun_same_day(self):
+        """Test that rerunning the snapshot on a changed day replaces that day's row"""
+        Snapshot = self.env['sn.statistics.snapshot']
+        domain = [('level', '=', 'agent'), ('ministry_id', '=', self.ministry.id)]
+
+        Snapshot._take_snapshot(date(2024, 1, 1))
+        self.env['sn.agent'].create({
+            'name': 'Agent Nouveau',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+        Snapshot._take_snapshot(date(2024, 1, 2))
+        self.env['sn.agent'].create({
+            'name': 'Agent Suivant',
+            'function': 'Test',
+            'service_id': self.service.id,
+        })
+        Snapshot._take_snapshot(date(2024, 1, 2))
+
+        rows = Snapshot.search(domain, order='date_from')
+        self.assertEqual(rows.mapped('record_count'), [4, 6])
+        self.assertEqual(rows.mapped('date_to'), [date(2024, 1, 1), date(2024, 1, 2)])
+
+        series = Snapshot.get_series(date(2024, 1, 1), date(2024, 1, 2), ministry_id=self.ministry.id)
+        self.assertEqual([value for _day, value in series], [4, 6])